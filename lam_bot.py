@@ -9,7 +9,17 @@ from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import json
+import csv
 import random
+import hashlib
+import io
+import heapq
+import math
+import numpy as np
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from collections import deque
 
 load_dotenv()
 
@@ -19,6 +29,31 @@ SHEET_ID      = os.getenv("SHEET_ID")  # Optional - can be set via /enterfolder
 SHEET_PAGE_NAME = os.getenv("SHEET_PAGE_NAME", "lambot")  # Name of the worksheet/tab within the sheet
 AUTO_CREATE_ROLES = os.getenv("AUTO_CREATE_ROLES", "true").lower() == "true"
 DEFAULT_ROLE_COLOR = os.getenv("DEFAULT_ROLE_COLOR", "light_gray")  # blue, red, green, purple, etc.
+GUILD_SETUP_CONCURRENCY = int(os.getenv("GUILD_SETUP_CONCURRENCY", "3"))  # Guilds set up at the same time on startup
+ADMIN_GLOBAL_CONCURRENCY = int(os.getenv("ADMIN_GLOBAL_CONCURRENCY", "0"))  # Admin operations across all guilds at once (0 = no cap)
+CHANNEL_FANOUT_CONCURRENCY = int(os.getenv("CHANNEL_FANOUT_CONCURRENCY", "5"))  # Channels a fan-out job posts to or edits at the same time
+SETUP_FINGERPRINT_SETTLE_SECONDS = 5  # Wait for the gateway to catch up with setup's own edits before fingerprinting
+STARTUP_SETUP_VERSION = 1  # Bump when the startup setup passes change so stored fingerprints are invalidated
+STATE_SNAPSHOT_VERSION = 3  # Bump when the per-guild state snapshot format changes
+STATE_REVALIDATE_SECONDS = int(os.getenv("STATE_REVALIDATE_SECONDS", "300"))  # Age after which a snapshot is revalidated in the background
+DRIVE_TREE_MAX_AGE_SECONDS = int(os.getenv("DRIVE_TREE_MAX_AGE_SECONDS", "120"))  # Age after which a materials lookup refetches the Drive folder tree
+DRIVE_PARENTS_PER_QUERY = 40  # Folders listed together in one files().list query (keeps the query string short)
+DRIVE_PAGE_SIZE = 1000  # Largest page files().list returns
+DRIVE_BATCH_SIZE = 100  # Most sub-requests Google accepts in one batch HTTP call
+TICKET_FLUSH_DELAY_SECONDS = 2  # Ticket changes within this window are written to the state store together
+TICKET_FLUSH_MAX_RETRY_SECONDS = 60  # Longest wait between retries of a failed ticket flush
+TICKET_RUNNERS_PER_PING = int(os.getenv("TICKET_RUNNERS_PER_PING", "3"))  # Least-loaded runners added per escalation step (0 = whole zone)
+RUNNER_CLAIM_WINDOW_MINUTES = 20  # A claimed ticket stays tracked (and counts toward its runner's load) this long unless closed sooner
+RUNNER_LATENCY_SAMPLES = 10  # Recent response times kept per runner
+EARTH_RADIUS_METRES = 6371000
+ZONE_BALANCE_TOLERANCE = float(os.getenv("ZONE_BALANCE_TOLERANCE", "0.15"))  # Balanced zones may exceed an even share by this fraction
+ZONE_TARGET_RADIUS_METRES = float(os.getenv("ZONE_TARGET_RADIUS_METRES", "400"))  # Auto zone count: farthest building to its zone centre
+ZONE_MIN_RUNNERS = int(os.getenv("ZONE_MIN_RUNNERS", "2"))  # Auto zone count: runners needed per zone
+AUTO_ZONE_MAX = 12  # Largest zone count tried automatically
+WALKING_TIMES_TAB = "Walking Times"  # Optional building-to-building walking-time matrix tab (minutes)
+WALKING_TIMES_CSV = os.getenv("WALKING_TIMES_CSV")  # Local CSV fallback for that matrix; may contain {guild_id}
+KMEDOIDS_CLARA_THRESHOLD = 300  # Larger matrices are clustered with CLARA samples instead of full PAM
+KMEDOIDS_CLARA_SAMPLES = 5
 
 # ⚠️ ⚠️ ⚠️  DANGER ZONE: COMPLETE SERVER RESET  ⚠️ ⚠️ ⚠️
 # Set to True to COMPLETELY RESET the server on bot startup
@@ -34,6 +69,11 @@ class LamBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix='!', intents=intents)
 
+    async def close(self):
+        # Write ticket changes still waiting for the batched flush before shutting down
+        await flush_ticket_changes(delay=0)
+        await super().close()
+
 bot = LamBot()
 
 # Set up gspread client and credentials for Drive API
@@ -59,19 +99,34 @@ pending_users = {}  # Changed from pending_roles to store more info
 # Track chapter role names globally
 chapter_role_names = set()
 
-# Track active help tickets for re-pinging
+# Track active help tickets for re-pinging (persisted in the state store so restarts keep escalating)
 active_help_tickets = {}  # thread_id -> ticket_info
+ticket_dirty_ids = set()  # thread_ids changed since the last flush
+ticket_removed_ids = set()  # thread_ids removed since the last flush
+ticket_flush_task = None
+ticket_flush_failures = 0  # Failed ticket flushes in a row, for the retry backoff
+ticket_schedule = []  # heap of (next_due_at, thread_id); stale entries are skipped when popped
+ticket_schedule_wakeup = asyncio.Event()  # set when tickets are added or resolved
+ticket_scheduler_task = None
+ticket_metrics_pending = {}  # thread_id -> finished ticket's timing record, written with the next flush
+HELPFUL_REACTIONS = ['👍', '✅', '🆗', '👌', '✋', '🙋', '🙋‍♂️', '🙋‍♀️']
+CLAIM_REACTION = '🙋'  # Added to every ticket ping so runners can claim with one click
+
+# Runner load for ticket routing (open and claimed tickets are counted from active_help_tickets)
+runner_latencies = {}  # runner_id -> deque of recent ping-to-claim times in seconds
 
 # Track active burger deliveries for stopping
 active_burger_deliveries = {}  # user_id -> {"stop": False, "user": user_object}
 
-# Cache configuration
+# State store configuration (bot_cache.json is the legacy cache, migrated into the store once)
+STATE_DB_FILE = os.getenv("STATE_DB_FILE", "bot_state.db")
 CACHE_FILE = "bot_cache.json"
 
-# Bit to show if setup is done
-admin_lock = asyncio.Lock()
+# Per-guild admin locks so configuration changes in one server don't block the others
+admin_locks = {}  # guild_id -> asyncio.Lock
+admin_global_semaphore = asyncio.Semaphore(ADMIN_GLOBAL_CONCURRENCY) if ADMIN_GLOBAL_CONCURRENCY > 0 else None
 rate_limit_lock = asyncio.Lock()
-reset_active = False
+reset_active_guilds = set()  # guild_ids where a server reset has run
 
 
 ALLOWED_DURING_RESET = {"enterfolder"}
@@ -79,85 +134,209 @@ ALLOWED_DURING_RESET = {"enterfolder"}
 #Setting bits for the server
 runner_all_access = 1
 
+# Role hierarchy fingerprints so unchanged role sets aren't reorganized on every sync
+role_hierarchy_fingerprints = None  # guild_id -> fingerprint of the role order after the last reorganization
+role_hierarchy_stats = {"executed": 0, "skipped": 0, "forced": 0}  # forced = /organizeroles runs, kept out of the fingerprint decisions
+
+# Per-guild startup readiness; commands in a guild are held back until its own setup finishes
+guild_setup_status = {}  # guild_id -> "pending" | "running" | "ready" | "failed"
+
+# Per-guild state snapshots (roster, runner sheet, zone map, Drive layout), persisted in the state store
+guild_state = None  # guild_id -> snapshot dict
+guild_state_refreshes = {}  # guild_id -> in-flight background revalidation task
+setup_fingerprint_tasks = set()  # in-flight fingerprint recordings for newly joined guilds
+runner_worksheets = {}  # guild_id -> opened Runner Assignments worksheet
+guild_routing = {}  # guild_id -> ticket routing table built from the state snapshot
+drive_folder_trees = {}  # guild_id -> {"root": folder_id, "folders": folder tree, "fetched_at": datetime}
+_drive_local = threading.local()  # Drive API services aren't thread-safe, so each thread keeps its own
+
+# Registry of bot-authored structural messages (welcome, test materials, runners, ...), persisted in the state store
+bot_message_registry = None  # "guild_id:channel_id:purpose" -> {"message_id": int, "content_hash": str}
+
+def get_admin_lock(guild_id):
+    """Get (or create) the admin lock for a guild"""
+    lock = admin_locks.get(guild_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        admin_locks[guild_id] = lock
+    return lock
+
+@asynccontextmanager
+async def guild_admin_session(guild_id):
+    """Hold a guild's admin lock, plus a slot of the optional global admin budget"""
+    async with get_admin_lock(guild_id):
+        if admin_global_semaphore is None:
+            yield
+        else:
+            async with admin_global_semaphore:
+                yield
+
 async def safe_call(coro):
     async with rate_limit_lock:
         result = await coro
         await asyncio.sleep(0.5)
         return result
     
-def save_cache(data):
-    """Save cache data to JSON file"""
-    try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"✅ Saved cache to {CACHE_FILE}")
-    except Exception as e:
-        print(f"❌ Error saving cache: {e}")
+class StateStore:
+    """
+    SQLite-backed (WAL mode) key/value store for bot state.
 
-def load_cache():
-    """Load cache data from JSON file"""
-    try:
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r') as f:
+    Values are JSON documents grouped by namespace ("guilds", "messages", "tickets", ...).
+    Every write is an atomic upsert of the affected rows, never a whole-file rewrite.
+    The blocking methods run on a worker thread through the async wrappers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " updated_at TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def get(self, namespace, key, default=None):
+        """Read one value (blocking)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, str(key))
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_all(self, namespace):
+        """Read every key/value of a namespace (blocking)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def put_many(self, namespace, items):
+        """Upsert several key/values of a namespace in one transaction (blocking)"""
+        now = datetime.now().isoformat()
+        rows = [(namespace, str(key), json.dumps(value), now) for key, value in items.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                rows
+            )
+
+    def delete_many(self, namespace, keys):
+        """Delete several keys of a namespace in one transaction (blocking)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", [(namespace, str(key)) for key in keys]
+            )
+
+    def apply(self, namespace, upserts, deletes):
+        """Upsert and delete keys of a namespace in one transaction (blocking)"""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(namespace, str(key), json.dumps(value), now) for key, value in upserts.items()]
+            )
+            self._conn.executemany(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", [(namespace, str(key)) for key in deletes]
+            )
+
+    def stats(self):
+        """Count stored keys per namespace (blocking)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT namespace, COUNT(*) FROM kv GROUP BY namespace").fetchall()
+        return dict(rows)
+
+    async def fetch(self, namespace, key, default=None):
+        return await asyncio.to_thread(self.get, namespace, key, default)
+
+    async def fetch_all(self, namespace):
+        return await asyncio.to_thread(self.get_all, namespace)
+
+    async def upsert(self, namespace, key, value):
+        await asyncio.to_thread(self.put_many, namespace, {key: value})
+
+    async def upsert_many(self, namespace, items):
+        if items:
+            await asyncio.to_thread(self.put_many, namespace, items)
+
+    async def remove(self, namespace, *keys):
+        if keys:
+            await asyncio.to_thread(self.delete_many, namespace, keys)
+
+    async def apply_changes(self, namespace, upserts, deletes):
+        if upserts or deletes:
+            await asyncio.to_thread(self.apply, namespace, upserts, deletes)
+
+    def migrate_json_cache(self, cache_file):
+        """Import the legacy JSON cache file once, then move it aside"""
+        if not os.path.exists(cache_file):
+            return
+        try:
+            with open(cache_file, 'r') as f:
                 data = json.load(f)
-            print(f"✅ Loaded cache from {CACHE_FILE}")
-            return data
-        else:
-            print(f"📄 No cache file found at {CACHE_FILE}")
-            return {}
-    except Exception as e:
-        print(f"❌ Error loading cache: {e}")
-        return {}
+            for namespace in ("guilds", "messages", "setup_fingerprints", "state"):
+                self.put_many(namespace, data.get(namespace, {}))
+            os.replace(cache_file, cache_file + ".migrated")
+            print(f"📦 Migrated {cache_file} into {self.path}")
+        except Exception as e:
+            print(f"❌ Error migrating {cache_file}: {e}")
 
-def clear_cache():
-    """Clear the cache file"""
-    try:
-        if os.path.exists(CACHE_FILE):
-            os.remove(CACHE_FILE)
-            print(f"🗑️ Cleared cache file {CACHE_FILE}")
-        else:
-            print(f"📄 No cache file to clear")
-    except Exception as e:
-        print(f"❌ Error clearing cache: {e}")
+state_store = StateStore(STATE_DB_FILE)
+state_store.migrate_json_cache(CACHE_FILE)
+
+def connect_cached_spreadsheet(spreadsheet_id, worksheet_name):
+    """Open a cached spreadsheet and worksheet (blocking, so run it in a thread)"""
+    spreadsheet = gc.open_by_key(spreadsheet_id)
+    sheet = spreadsheet.worksheet(worksheet_name)
+    return spreadsheet, sheet
 
 async def load_spreadsheets_from_cache():
     """Try to load all guild spreadsheet connections from cache"""
     global sheets, spreadsheets
 
-    cache = load_cache()
-    guilds_cache = cache.get("guilds", {})
+    guilds_cache = await state_store.fetch_all("guilds")
 
     if not guilds_cache:
         print("📋 No cached spreadsheet connections found")
         return False
 
-    success_count = 0
-    for guild_id_str, guild_cache in guilds_cache.items():
-        guild_id = int(guild_id_str)
-        spreadsheet_id = guild_cache.get("spreadsheet_id")
-        worksheet_name = guild_cache.get("worksheet_name", SHEET_PAGE_NAME)
-
-        if not spreadsheet_id:
-            continue
-
+    async def connect_guild(guild_id, spreadsheet_id, worksheet_name):
         try:
             print(f"🔄 Attempting to connect to cached spreadsheet for guild {guild_id}: {spreadsheet_id}")
-            spreadsheet = gc.open_by_key(spreadsheet_id)
-            sheet = spreadsheet.worksheet(worksheet_name)
-
-            # Test the connection by getting the first row
-            headers = sheet.row_values(1)
+            spreadsheet, sheet = await asyncio.to_thread(connect_cached_spreadsheet, spreadsheet_id, worksheet_name)
 
             # Store in per-guild dictionaries
             spreadsheets[guild_id] = spreadsheet
             sheets[guild_id] = sheet
 
             print(f"✅ Successfully connected to cached spreadsheet for guild {guild_id}: '{spreadsheet.title}'")
-            print(f"📊 Worksheet: '{sheet.title}' with {len(headers)} columns")
-            success_count += 1
+            print(f"📊 Worksheet: '{sheet.title}'")
+            return True
 
         except Exception as e:
             print(f"❌ Failed to connect to cached spreadsheet for guild {guild_id}: {e}")
+            return False
+
+    # Connect every cached guild at once; the gspread calls run in worker threads
+    connections = []
+    for guild_id_str, guild_cache in guilds_cache.items():
+        spreadsheet_id = guild_cache.get("spreadsheet_id")
+        if not spreadsheet_id:
+            continue
+        worksheet_name = guild_cache.get("worksheet_name", SHEET_PAGE_NAME)
+        connections.append(connect_guild(int(guild_id_str), spreadsheet_id, worksheet_name))
+
+    results = await asyncio.gather(*connections)
+    success_count = sum(1 for connected in results if connected)
 
     if success_count > 0:
         print(f"✅ Loaded {success_count} cached spreadsheet connection(s)")
@@ -166,31 +345,195 @@ async def load_spreadsheets_from_cache():
         print("❌ No cached connections could be loaded")
         return False
 
-def save_guild_spreadsheet_to_cache(guild_id, spreadsheet_id, worksheet_name):
-    """Save a guild's spreadsheet connection to cache"""
-    cache = load_cache()
-
-    if "guilds" not in cache:
-        cache["guilds"] = {}
-
-    cache["guilds"][str(guild_id)] = {
+async def save_guild_spreadsheet_to_cache(guild_id, spreadsheet_id, worksheet_name):
+    """Save a guild's spreadsheet connection to the state store"""
+    await state_store.upsert("guilds", guild_id, {
         "spreadsheet_id": spreadsheet_id,
         "worksheet_name": worksheet_name
-    }
-
-    save_cache(cache)
+    })
     print(f"💾 Cached spreadsheet connection for guild {guild_id}")
 
-def clear_guild_cache(guild_id):
-    """Clear a specific guild's cache"""
-    cache = load_cache()
+async def clear_guild_cache(guild_id):
+    """Clear a specific guild's cached connection and state snapshot"""
+    if await state_store.fetch("guilds", guild_id) is None:
+        return False
 
-    if "guilds" in cache and str(guild_id) in cache["guilds"]:
-        del cache["guilds"][str(guild_id)]
-        save_cache(cache)
-        print(f"🧹 Cleared cache for guild {guild_id}")
-        return True
-    return False
+    await state_store.remove("guilds", guild_id)
+    await state_store.remove("state", guild_id)
+    load_guild_states().pop(guild_id, None)
+    runner_worksheets.pop(guild_id, None)
+    guild_routing.pop(guild_id, None)
+    print(f"🧹 Cleared cache for guild {guild_id}")
+    return True
+
+def load_bot_message_registry():
+    """Load the bot message registry from the state store on first use"""
+    global bot_message_registry
+    if bot_message_registry is None:
+        bot_message_registry = state_store.get_all("messages")
+    return bot_message_registry
+
+def get_registered_message(guild_id, channel_id, purpose):
+    """Look up a registered bot message without touching the Discord API"""
+    return load_bot_message_registry().get(f"{guild_id}:{channel_id}:{purpose}")
+
+async def register_bot_message(guild_id, channel_id, purpose, message_id, content_hash):
+    """Record a bot message and the hash of its content in the registry"""
+    key = f"{guild_id}:{channel_id}:{purpose}"
+    entry = {"message_id": message_id, "content_hash": content_hash}
+    load_bot_message_registry()[key] = entry
+    await state_store.upsert("messages", key, entry)
+    return entry
+
+async def forget_bot_message(guild_id, channel_id, purpose):
+    """Drop a bot message from the registry"""
+    key = f"{guild_id}:{channel_id}:{purpose}"
+    if load_bot_message_registry().pop(key, None) is not None:
+        await state_store.remove("messages", key)
+
+def compute_embed_hash(embed):
+    """Hash an embed's content so unchanged messages can be detected without fetching them"""
+    return hashlib.sha256(json.dumps(embed.to_dict(), sort_keys=True).encode()).hexdigest()
+
+async def find_legacy_bot_message(channel, title_fragment, pinned=False):
+    """Find a bot message posted before the registry existed by its embed title"""
+    try:
+        if pinned:
+            messages = await safe_call(channel.pins())
+        else:
+            messages = [message async for message in channel.history(limit=10)]
+    except Exception as e:
+        print(f"⚠️ Could not scan #{channel.name} for existing messages: {e}")
+        return None
+
+    for message in messages:
+        if (message.author == bot.user and message.embeds and
+                message.embeds[0].title and title_fragment in message.embeds[0].title):
+            return message
+    return None
+
+async def post_or_update_registered_message(channel, purpose, embed, pin=False, legacy_title=None):
+    """
+    Post a structural bot message once and keep it current through the message registry.
+
+    Args:
+        channel: Channel the message belongs in
+        purpose: Registry purpose (e.g. "welcome_tldr", "test_materials:Anatomy")
+        embed: Embed the message should show
+        pin: Whether to pin the message when it is first posted
+        legacy_title: Embed title fragment used to adopt a message posted before the registry existed
+
+    Returns:
+        "unchanged", "edited" or "posted" (None if Discord kept rate limiting the call)
+    """
+    guild_id = channel.guild.id
+    content_hash = compute_embed_hash(embed)
+    entry = get_registered_message(guild_id, channel.id, purpose)
+
+    # One-time adoption of messages posted before the registry existed
+    if entry is None and legacy_title:
+        legacy_message = await find_legacy_bot_message(channel, legacy_title, pinned=pin)
+        if legacy_message:
+            print(f"📇 Adopted existing {purpose} message in #{channel.name} into the registry")
+            entry = await register_bot_message(guild_id, channel.id, purpose, legacy_message.id,
+                                         compute_embed_hash(legacy_message.embeds[0]))
+
+    if entry is not None:
+        if entry["content_hash"] == content_hash:
+            return "unchanged"
+        try:
+            edited = await handle_rate_limit(
+                channel.get_partial_message(entry["message_id"]).edit(embed=embed),
+                f"editing {purpose} message in #{channel.name}"
+            )
+            if edited is None:
+                return None
+            await register_bot_message(guild_id, channel.id, purpose, entry["message_id"], content_hash)
+            print(f"✏️ Updated {purpose} message in #{channel.name}")
+            return "edited"
+        except discord.NotFound:
+            print(f"⚠️ Registered {purpose} message in #{channel.name} no longer exists, posting a new one")
+            await forget_bot_message(guild_id, channel.id, purpose)
+
+    message = await handle_rate_limit(
+        channel.send(embed=embed),
+        f"posting {purpose} message in #{channel.name}"
+    )
+    if message is None:
+        return None
+    await register_bot_message(guild_id, channel.id, purpose, message.id, content_hash)
+
+    if pin:
+        try:
+            await safe_call(message.pin())
+            print(f"📌 Pinned {purpose} message in #{channel.name}")
+        except discord.Forbidden:
+            print(f"⚠️ No permission to pin message in #{channel.name}")
+        except Exception as pin_error:
+            print(f"⚠️ Error pinning message in #{channel.name}: {pin_error}")
+
+    return "posted"
+
+async def fan_out_registered_messages(jobs, concurrency=CHANNEL_FANOUT_CONCURRENCY):
+    """
+    Post or update registered messages in many channels concurrently.
+
+    Discord rate limits message sends and edits per channel, so different channels go out
+    side by side (at most `concurrency` at a time); 429s are retried by handle_rate_limit.
+
+    Args:
+        jobs: List of (channel, purpose, embed, legacy_title) tuples
+
+    Returns:
+        One result per job: a post_or_update_registered_message status, or the exception it raised
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(channel, purpose, embed, legacy_title):
+        async with semaphore:
+            return await post_or_update_registered_message(channel, purpose, embed, legacy_title=legacy_title)
+
+    return await asyncio.gather(*(_run(*job) for job in jobs), return_exceptions=True)
+
+async def sync_registered_message_chunks(channel, purpose, embeds, legacy_title=None):
+    """
+    Keep a multi-message listing (first message pinned, then continuations) in sync with the registry.
+
+    Continuation messages left over from a longer previous listing are deleted.
+
+    Returns:
+        Status of the first message ("unchanged", "edited" or "posted")
+    """
+    status = None
+    for i, embed in enumerate(embeds, start=1):
+        chunk_purpose = purpose if i == 1 else f"{purpose}:{i}"
+        chunk_status = await post_or_update_registered_message(
+            channel, chunk_purpose, embed,
+            pin=(i == 1),
+            legacy_title=legacy_title if i == 1 else None
+        )
+        if status is None:
+            status = chunk_status
+        if chunk_status != "unchanged":
+            await asyncio.sleep(0.2)
+
+    # Remove continuation messages the listing no longer needs
+    i = len(embeds) + 1
+    while True:
+        entry = get_registered_message(channel.guild.id, channel.id, f"{purpose}:{i}")
+        if entry is None:
+            break
+        try:
+            await handle_rate_limit(
+                channel.get_partial_message(entry["message_id"]).delete(),
+                f"deleting stale {purpose} continuation in #{channel.name}"
+            )
+        except discord.NotFound:
+            pass
+        await forget_bot_message(channel.guild.id, channel.id, f"{purpose}:{i}")
+        i += 1
+
+    return status
 
 async def handle_rate_limit(coro, operation_name, max_retries=3, default_delay=0.1):
     """
@@ -248,6 +591,53 @@ async def handle_rate_limit(coro, operation_name, max_retries=3, default_delay=0
 
     return None
 
+def plan_position_changes(desired_order, slots=None):
+    """
+    Work out which items actually need to move to reach desired_order.
+
+    Args:
+        desired_order: Channels, categories or roles in the order they should end up in
+        slots: Position values to hand out in order (default: 0..n-1)
+
+    Returns:
+        Dict of item -> new position, containing only items whose position differs
+    """
+    if slots is None:
+        slots = range(len(desired_order))
+
+    changes = {}
+    for item, position in zip(desired_order, slots):
+        if item.position != position:
+            changes[item] = position
+    return changes
+
+async def bulk_update_channel_positions(guild, positions, reason, max_retries=3):
+    """Move several channels/categories with one bulk PATCH instead of one edit per channel.
+
+    Returns the number of channels moved, or 0 if Discord kept rate limiting the request.
+    """
+    if not positions:
+        return 0
+
+    payload = [{"id": channel.id, "position": position} for channel, position in positions.items()]
+    # The request is rebuilt on every attempt (an awaited coroutine can't be retried), and the
+    # give-up case is reported as 0 so callers don't log moves that never happened
+    for attempt in range(1, max_retries + 1):
+        try:
+            await guild._state.http.bulk_channel_update(guild.id, payload, reason=reason)
+            await asyncio.sleep(0.1)
+            return len(payload)
+        except discord.HTTPException as e:
+            if e.status != 429:
+                raise
+            if attempt < max_retries:
+                retry_after = float(getattr(e, 'retry_after', None) or 1.0)
+                print(f"⚠️ Rate limited on bulk moving {len(payload)} channel(s), waiting {retry_after}s before retry {attempt}/{max_retries}...")
+                await asyncio.sleep(retry_after)
+
+    print(f"❌ Rate limited on bulk moving {len(payload)} channel(s) after {max_retries} retries, giving up")
+    return 0
+
 async def get_or_create_role(guild, role_name):
     """Get a role by name, or create it if it doesn't exist"""
     role = discord.utils.get(guild.roles, name=role_name)
@@ -519,9 +909,6 @@ async def sort_building_categories_alphabetically(guild):
         building_categories.sort(key=lambda cat: cat.name.lower())
         print(f"📋 DEBUG: Sorted {len(building_categories)} building categories alphabetically")
 
-        # Calculate positions: static categories first, then building categories
-        position = 0
-
         # Position static categories first in the correct order
         desired_order = ["Welcome", "Tournament Officials", "Chapters", "Volunteers"]
         ordered_static_categories = []
@@ -538,28 +925,22 @@ async def sort_building_categories_alphabetically(guild):
             if category not in ordered_static_categories:
                 ordered_static_categories.append(category)
 
-        for category in ordered_static_categories:
-            if category.position != position:
-                result = await handle_rate_limit(
-                    category.edit(position=position, reason="Organizing categories"),
-                    f"moving category '{category.name}'"
-                )
-                if result is not None:
-                    print(f"📋 Moved category '{category.name}' to position {position}")
-            position += 1
-
-        # Position building categories alphabetically after static ones
-        for category in building_categories:
-            if category.position != position:
-                result = await handle_rate_limit(
-                    category.edit(position=position, reason="Organizing building categories alphabetically"),
-                    f"moving building category '{category.name}'"
-                )
-                if result is not None:
-                    print(f"🏢 Moved building category '{category.name}' to position {position}")
-            position += 1
+        # Static categories first, then building categories alphabetically.
+        # Only categories that are out of place go into a single bulk update.
+        final_order = ordered_static_categories + building_categories
+        position_changes = plan_position_changes(final_order)
 
-        print("📋 Categories organized: Static categories first, then buildings alphabetically")
+        if not position_changes:
+            print("📋 Categories already in order, nothing to move")
+            return
+
+        if not await bulk_update_channel_positions(guild, position_changes, "Organizing categories"):
+            print(f"⚠️ Categories were not reordered ({len(position_changes)} still out of place)")
+            return
+        for category, position in position_changes.items():
+            print(f"📋 Moved category '{category.name}' to position {position}")
+
+        print(f"📋 Categories organized with 1 bulk update ({len(position_changes)} moved): Static categories first, then buildings alphabetically")
 
     except Exception as e:
         print(f"⚠️ Error organizing categories: {e}")
@@ -569,6 +950,17 @@ def sanitize_for_discord(text):
     # Replace spaces with hyphens and remove/replace invalid characters
     return text.lower().replace(' ', '-').replace('/', '-').replace('\\', '-').replace(':', '-').replace('*', '-').replace('?', '-').replace('"', '').replace('<', '').replace('>', '').replace('|', '-')
 
+def building_chat_name(building):
+    """Channel name of a building's chat"""
+    return f"{sanitize_for_discord(building)}-chat"
+
+def build_channel_index(guild):
+    """Index a guild's text channels by name, so many lookups cost one pass over the channel list"""
+    index = {}
+    for channel in guild.text_channels:
+        index.setdefault(channel.name, channel)  # First match wins, like discord.utils.get
+    return index
+
 async def setup_building_structure(guild, building, first_event, room=None):
     """Set up category and channels for a building and event"""
     print(f"🏗️ DEBUG: Setting up building structure - Building: '{building}', Event: '{first_event}', Room: '{room}'")
@@ -590,18 +982,15 @@ async def setup_building_structure(guild, building, first_event, room=None):
     runner_role = discord.utils.get(guild.roles, name="Runner")
 
     # Create general building chat channel (restricted to people with events in this building)
-    building_chat_name = f"{sanitize_for_discord(building)}-chat"
-    print(f"📺 DEBUG: Getting/creating building chat: '{building_chat_name}'")
-    building_chat = await get_or_create_channel(guild, building_chat_name, category, is_building_chat=True)
+    chat_name = building_chat_name(building)
+    print(f"📺 DEBUG: Getting/creating building chat: '{chat_name}'")
+    building_chat = await get_or_create_channel(guild, chat_name, category, is_building_chat=True)
 
-    # Check if this is a newly created building chat (no messages yet) and send welcome message
+    # Post the welcome message, or edit it in place when the building's events or rooms changed
+    # (an unchanged message is recognised by its content hash and costs no API call)
     if building_chat:
         try:
-            # Check if the channel has any messages (to avoid sending duplicate welcome messages)
-            messages = [message async for message in building_chat.history(limit=1)]
-            if not messages:
-                print(f"📝 Building chat #{building_chat.name} appears to be new, sending welcome message...")
-                await send_building_welcome_message(guild, building_chat, building)
+            await send_building_welcome_message(guild, building_chat, building)
         except Exception as e:
             print(f"⚠️ Error checking/sending welcome message for #{building_chat.name}: {e}")
 
@@ -642,68 +1031,11 @@ async def search_and_share_test_folder(guild, role_name):
             print(f"❌ DEBUG: No spreadsheet connected for guild {guild_id}, cannot search for test folder for {role_name}")
             return
 
-        guild_spreadsheet = spreadsheets[guild_id]
-        print(f"✅ DEBUG: Spreadsheet connected, ID: {guild_spreadsheet.id}")
-
-        # Import Drive API
-        from googleapiclient.discovery import build
-
-        # Build Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
-
-        # Get the parent folder ID of the connected spreadsheet
-        sheet_metadata = drive_service.files().get(fileId=guild_spreadsheet.id, fields='parents').execute()
-        parent_folders = sheet_metadata.get('parents', [])
-
-        if not parent_folders:
-            print(f"❌ DEBUG: Could not find parent folder for the spreadsheet")
+        # The event folder is read from the guild's Drive folder tree snapshot
+        files = await find_drive_folder_items(guild_id, "Tests", role_name)
+        if files is None:
             return
 
-        parent_folder_id = parent_folders[0]
-        print(f"✅ DEBUG: Found parent folder ID: {parent_folder_id}")
-
-        # Search for "Tests" folder in the parent directory
-        tests_query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and name='Tests'"
-        tests_results = drive_service.files().list(q=tests_query, fields='files(id, name)').execute()
-        tests_folders = tests_results.get('files', [])
-
-        if not tests_folders:
-            print(f"❌ DEBUG: No 'Tests' folder found in the parent directory")
-            print(f"🔍 DEBUG: Searching for any folders in parent directory...")
-            # List all folders in parent to help debug
-            all_folders_query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            all_folders_results = drive_service.files().list(q=all_folders_query, fields='files(id, name)').execute()
-            all_folders = all_folders_results.get('files', [])
-            print(f"📁 DEBUG: Found folders: {[f['name'] for f in all_folders]}")
-            return
-
-        tests_folder_id = tests_folders[0]['id']
-        print(f"✅ DEBUG: Found Tests folder: {tests_folder_id}")
-
-        # Search for the event-specific folder within Tests
-        event_query = f"'{tests_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and name='{role_name}'"
-        event_results = drive_service.files().list(q=event_query, fields='files(id, name, webViewLink)').execute()
-        event_folders = event_results.get('files', [])
-
-        if not event_folders:
-            print(f"❌ DEBUG: No folder found for event '{role_name}' in Tests directory")
-            print(f"🔍 DEBUG: Searching for any folders in Tests directory...")
-            # List all folders in Tests to help debug
-            all_test_folders_query = f"'{tests_folder_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            all_test_folders_results = drive_service.files().list(q=all_test_folders_query, fields='files(id, name)').execute()
-            all_test_folders = all_test_folders_results.get('files', [])
-            print(f"📁 DEBUG: Found test folders: {[f['name'] for f in all_test_folders]}")
-            return
-
-        event_folder = event_folders[0]
-        event_folder_id = event_folder['id']
-        print(f"✅ DEBUG: Found test folder for {role_name}: {event_folder_id}")
-
-        # Get all files in the event folder
-        files_query = f"'{event_folder_id}' in parents and trashed=false"
-        files_results = drive_service.files().list(q=files_query, fields='files(id, name, webViewLink, mimeType)').execute()
-        files = files_results.get('files', [])
-
         if not files:
             print(f"❌ DEBUG: No files found in {role_name} test folder")
             return
@@ -731,19 +1063,6 @@ async def search_and_share_test_folder(guild, role_name):
             print(f"🔍 DEBUG: Searched for channels containing: '{role_name.lower().replace(' ', '-')}'")
             return
 
-        # Check if test materials message already exists in pinned messages
-        pinned_messages = await safe_call(target_channel.pins())
-        test_materials_exists = False
-
-        for message in pinned_messages:
-            if message.embeds and message.embeds[0].title and f"📚 Test Materials for {role_name}" in message.embeds[0].title:
-                test_materials_exists = True
-                print(f"✅ DEBUG: Test materials message already pinned in #{target_channel.name}, skipping")
-                break
-
-        if test_materials_exists:
-            return
-
         # Create embed for the test materials
         embed = discord.Embed(
             title=f"📚 Test Materials for {role_name}",
@@ -796,80 +1115,55 @@ async def search_and_share_test_folder(guild, role_name):
         if current_chunk.strip():
             chunks.append(current_chunk.strip())
 
-        # Send the first message with the main embed
+        # The first message carries the main embed, remaining chunks become continuation messages
         embed.add_field(name="📋 Test Materials", value=chunks[0] if chunks else "No files found", inline=False)
-        message = await target_channel.send(embed=embed)
-        await asyncio.sleep(0.2)
-        print(f"📚 Shared test materials for {role_name} in #{target_channel.name}")
-
-        # Pin the first message
-        try:
-            await safe_call(message.pin())
-            print(f"📌 Pinned test materials message in #{target_channel.name}")
-        except discord.Forbidden:
-            print(f"⚠️ No permission to pin message in #{target_channel.name}")
-        except Exception as pin_error:
-            print(f"⚠️ Error pinning message in #{target_channel.name}: {pin_error}")
-
-        # Send additional messages for remaining chunks
-        if len(chunks) > 1:
-            for i, chunk in enumerate(chunks[1:], start=2):
-                continuation_embed = discord.Embed(
-                    title=f"📚 Test Materials for {role_name} (continued {i})",
-                    description="",
-                    color=discord.Color.green()
-                )
-                continuation_embed.add_field(name="📋 Test Materials", value=chunk, inline=False)
-                await target_channel.send(embed=continuation_embed)
-                print(f"📚 Sent continuation message {i} for {role_name}")
-                await asyncio.sleep(0.5)
-
-        # Check if scoring message already exists in pinned messages
-        scoring_message_exists = False
-        for msg in pinned_messages:
-            if msg.embeds and msg.embeds[0].title and "📊 Score Input Instructions" in msg.embeds[0].title:
-                scoring_message_exists = True
-                print(f"✅ DEBUG: Scoring message already pinned in #{target_channel.name}, skipping")
-                break
-
-        if not scoring_message_exists:
-            # Create scoring instructions embed
-            scoring_embed = discord.Embed(
-                title="📊 Score Input Instructions",
-                description="**IMPORTANT**: All Lead Event Supervisors must input scores through the official scoring portal!",
-                color=discord.Color.blue()
+        embeds = [embed]
+        for i, chunk in enumerate(chunks[1:], start=2):
+            continuation_embed = discord.Embed(
+                title=f"📚 Test Materials for {role_name} (continued {i})",
+                description="",
+                color=discord.Color.green()
             )
+            continuation_embed.add_field(name="📋 Test Materials", value=chunk, inline=False)
+            embeds.append(continuation_embed)
 
-            scoring_embed.add_field(
-                name="🔗 Scoring Portal",
-                value="[**Click here to access the scoring system**](https://scoring.duosmium.org/login)",
-                inline=False
-            )
+        status = await sync_registered_message_chunks(
+            target_channel, f"test_materials:{role_name}", embeds,
+            legacy_title=f"📚 Test Materials for {role_name}"
+        )
+        print(f"📚 Test materials for {role_name} in #{target_channel.name}: {status}")
 
-            scoring_embed.add_field(
-                name="📋 Instructions",
-                value="• Lead Event Supervisors should have received an invitation email to the scoring portal\n• Select the correct tournament and event\n• Input all team scores accurately\n• Double-check scores before submitting\n• Contact admin if you have login issues",
-                inline=False
-            )
+        # Create scoring instructions embed
+        scoring_embed = discord.Embed(
+            title="📊 Score Input Instructions",
+            description="**IMPORTANT**: All Lead Event Supervisors must input scores through the official scoring portal!",
+            color=discord.Color.blue()
+        )
 
-            scoring_embed.add_field(
-                name="⚠️ Important Notes",
-                value="• Scores must be entered promptly after each event\n• Do not share your login credentials\n• Report any technical issues immediately",
-                inline=False
-            )
+        scoring_embed.add_field(
+            name="🔗 Scoring Portal",
+            value="[**Click here to access the scoring system**](https://scoring.duosmium.org/login)",
+            inline=False
+        )
 
-            # Post the scoring embed
-            scoring_message = await target_channel.send(embed=scoring_embed)
-            print(f"📊 Shared scoring instructions for {role_name} in #{target_channel.name}")
+        scoring_embed.add_field(
+            name="📋 Instructions",
+            value="• Lead Event Supervisors should have received an invitation email to the scoring portal\n• Select the correct tournament and event\n• Input all team scores accurately\n• Double-check scores before submitting\n• Contact admin if you have login issues",
+            inline=False
+        )
 
-            # Pin the scoring message
-            try:
-                await safe_call(scoring_message.pin())
-                print(f"📌 Pinned scoring instructions message in #{target_channel.name}")
-            except discord.Forbidden:
-                print(f"⚠️ No permission to pin scoring message in #{target_channel.name}")
-            except Exception as pin_error:
-                print(f"⚠️ Error pinning scoring message in #{target_channel.name}: {pin_error}")
+        scoring_embed.add_field(
+            name="⚠️ Important Notes",
+            value="• Scores must be entered promptly after each event\n• Do not share your login credentials\n• Report any technical issues immediately",
+            inline=False
+        )
+
+        # Post (and pin) the scoring instructions unless the registered copy is already current
+        status = await post_or_update_registered_message(
+            target_channel, "scoring_instructions", scoring_embed, pin=True,
+            legacy_title="📊 Score Input Instructions"
+        )
+        print(f"📊 Scoring instructions for {role_name} in #{target_channel.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error searching for test folder for {role_name}: {e}")
@@ -915,8 +1209,7 @@ async def setup_chapter_structure(guild, chapter_name):
             )
             print(f"📖 Set up permissions for #{channel_name} chapter channel")
 
-            # Sort chapter channels after creating a new one
-            await sort_chapter_channels_alphabetically(guild)
+            # Chapter channels are sorted once by the caller after all chapters are set up
 
         except Exception as e:
             print(f"❌ Error setting up permissions for #{channel_name}: {e}")
@@ -948,20 +1241,26 @@ async def sort_chapter_channels_alphabetically(guild):
         # Combine: other channels first, then unaffiliated at the bottom
         final_order = other_channels + unaffiliated_channels
 
-        # Update positions within the category
-        for i, channel in enumerate(final_order):
-            if channel.position != i:
-                try:
-                    result = await handle_rate_limit(
-                        channel.edit(position=i, reason="Sorting chapter channels alphabetically"),
-                        f"moving channel '{channel.name}'"
-                    )
-                    if result is not None:
-                        print(f"📖 Moved #{channel.name} to position {i}")
-                except Exception as e:
-                    print(f"❌ Error moving #{channel.name}: {e}")
+        # Reuse the position slots the chapter channels already occupy so the rest
+        # of the guild's channels are untouched, then move only misplaced ones in one call
+        slots = sorted(channel.position for channel in chapter_channels)
+        position_changes = plan_position_changes(final_order, slots)
+
+        if not position_changes:
+            print("📖 Chapter channels already in order, nothing to move")
+            return
+
+        try:
+            if not await bulk_update_channel_positions(guild, position_changes, "Sorting chapter channels alphabetically"):
+                print(f"⚠️ Chapter channels were not reordered ({len(position_changes)} still out of place)")
+                return
+            for channel, position in position_changes.items():
+                print(f"📖 Moved #{channel.name} to position {position}")
+        except Exception as e:
+            print(f"❌ Error moving chapter channels: {e}")
+            return
 
-        print("✅ Chapter channels sorted alphabetically (unaffiliated at bottom)")
+        print(f"✅ Chapter channels sorted alphabetically (unaffiliated at bottom) with 1 bulk update ({len(position_changes)} moved)")
 
     except Exception as e:
         print(f"❌ Error sorting chapter channels: {e}")
@@ -977,44 +1276,11 @@ async def search_and_share_useful_links(guild):
             print(f"❌ DEBUG: No spreadsheet connected for guild {guild_id}, cannot search for Useful Links folder")
             return
 
-        guild_spreadsheet = spreadsheets[guild_id]
-        print(f"✅ DEBUG: Spreadsheet connected, ID: {guild_spreadsheet.id}")
-
-        # Import Drive API
-        from googleapiclient.discovery import build
-
-        # Build Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
-
-        # Get the parent folder ID of the connected spreadsheet
-        sheet_metadata = drive_service.files().get(fileId=guild_spreadsheet.id, fields='parents').execute()
-        parent_folders = sheet_metadata.get('parents', [])
-
-        if not parent_folders:
-            print(f"❌ DEBUG: Could not find parent folder for the spreadsheet")
-            return
-
-        parent_folder_id = parent_folders[0]
-        print(f"✅ DEBUG: Found parent folder ID: {parent_folder_id}")
-
-        # Search for "Useful Links" folder in the parent directory
-        useful_links_query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and name='Useful Links'"
-        useful_links_results = drive_service.files().list(q=useful_links_query, fields='files(id, name, webViewLink)').execute()
-        useful_links_folders = useful_links_results.get('files', [])
-
-        if not useful_links_folders:
-            print(f"❌ DEBUG: No 'Useful Links' folder found in the parent directory")
+        # The folder is read from the guild's Drive folder tree snapshot
+        files = await find_drive_folder_items(guild_id, "Useful Links")
+        if files is None:
             return
 
-        useful_links_folder = useful_links_folders[0]
-        useful_links_folder_id = useful_links_folder['id']
-        print(f"✅ DEBUG: Found Useful Links folder: {useful_links_folder_id}")
-
-        # Get all files in the Useful Links folder
-        files_query = f"'{useful_links_folder_id}' in parents and trashed=false"
-        files_results = drive_service.files().list(q=files_query, fields='files(id, name, webViewLink, mimeType)').execute()
-        files = files_results.get('files', [])
-
         if not files:
             print(f"❌ DEBUG: No files found in Useful Links folder")
             return
@@ -1030,26 +1296,6 @@ async def search_and_share_useful_links(guild):
 
         print(f"✅ DEBUG: Found target channel: #{target_channel.name}")
 
-        # Delete old pinned useful links messages from the bot
-        pinned_messages = await safe_call(target_channel.pins())
-        deleted_count = 0
-        
-        for message in pinned_messages:
-            # Check if this is a useful links message sent by the bot
-            if message.author == bot.user and message.embeds:
-                if message.embeds[0].title and "🔗 Useful Links & Resources" in message.embeds[0].title:
-                    try:
-                        await message.delete()
-                        deleted_count += 1
-                        print(f"🗑️ Deleted old pinned useful links message from #{target_channel.name}")
-                        # Small delay to avoid rate limiting
-                        await asyncio.sleep(0.2)
-                    except Exception as delete_error:
-                        print(f"⚠️ Could not delete useful links message in #{target_channel.name}: {delete_error}")
-        
-        if deleted_count > 0:
-            print(f"✅ Cleaned up {deleted_count} old useful links message(s)")
-
         # Create embed for the useful links
         embed = discord.Embed(
             title="🔗 Useful Links & Resources",
@@ -1102,32 +1348,23 @@ async def search_and_share_useful_links(guild):
         if current_chunk.strip():
             chunks.append(current_chunk.strip())
 
-        # Send the first message with the main embed
+        # The first message carries the main embed, remaining chunks become continuation messages
         embed.add_field(name="📋 Useful Links", value=chunks[0] if chunks else "No files found", inline=False)
-        message = await target_channel.send(embed=embed)
-        print(f"🔗 Shared useful links in #{target_channel.name}")
+        embeds = [embed]
+        for i, chunk in enumerate(chunks[1:], start=2):
+            continuation_embed = discord.Embed(
+                title=f"🔗 Useful Links & Resources (continued {i})",
+                description="",
+                color=discord.Color.green()
+            )
+            continuation_embed.add_field(name="📋 Useful Links", value=chunk, inline=False)
+            embeds.append(continuation_embed)
 
-        # Pin the first message
-        try:
-            await safe_call(message.pin())
-            print(f"📌 Pinned useful links message in #{target_channel.name}")
-        except discord.Forbidden:
-            print(f"⚠️ No permission to pin message in #{target_channel.name}")
-        except Exception as pin_error:
-            print(f"⚠️ Error pinning message in #{target_channel.name}: {pin_error}")
-
-        # Send additional messages for remaining chunks
-        if len(chunks) > 1:
-            for i, chunk in enumerate(chunks[1:], start=2):
-                continuation_embed = discord.Embed(
-                    title=f"🔗 Useful Links & Resources (continued {i})",
-                    description="",
-                    color=discord.Color.green()
-                )
-                continuation_embed.add_field(name="📋 Useful Links", value=chunk, inline=False)
-                await target_channel.send(embed=continuation_embed)
-                print(f"🔗 Sent continuation message {i} for useful links")
-                await asyncio.sleep(0.5)
+        # Edit the registered messages in place instead of deleting and reposting them
+        status = await sync_registered_message_chunks(
+            target_channel, "useful_links", embeds, legacy_title="🔗 Useful Links & Resources"
+        )
+        print(f"🔗 Useful Links in #{target_channel.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error searching for Useful Links folder: {e}")
@@ -1143,44 +1380,11 @@ async def search_and_share_runner_info(guild):
             print(f"❌ DEBUG: No spreadsheet connected for guild {guild_id}, cannot search for Runner folder")
             return
 
-        guild_spreadsheet = spreadsheets[guild_id]
-        print(f"✅ DEBUG: Spreadsheet connected, ID: {guild_spreadsheet.id}")
-
-        # Import Drive API
-        from googleapiclient.discovery import build
-
-        # Build Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
-
-        # Get the parent folder ID of the connected spreadsheet
-        sheet_metadata = drive_service.files().get(fileId=guild_spreadsheet.id, fields='parents').execute()
-        parent_folders = sheet_metadata.get('parents', [])
-
-        if not parent_folders:
-            print(f"❌ DEBUG: Could not find parent folder for the spreadsheet")
-            return
-
-        parent_folder_id = parent_folders[0]
-        print(f"✅ DEBUG: Found parent folder ID: {parent_folder_id}")
-
-        # Search for "Runner" folder in the parent directory
-        runner_query = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and name='Runner'"
-        runner_results = drive_service.files().list(q=runner_query, fields='files(id, name, webViewLink)').execute()
-        runner_folders = runner_results.get('files', [])
-
-        if not runner_folders:
-            print(f"❌ DEBUG: No 'Runner' folder found in the parent directory")
+        # The folder is read from the guild's Drive folder tree snapshot
+        files = await find_drive_folder_items(guild_id, "Runner")
+        if files is None:
             return
 
-        runner_folder = runner_folders[0]
-        runner_folder_id = runner_folder['id']
-        print(f"✅ DEBUG: Found Runner folder: {runner_folder_id}")
-
-        # Get all files in the Runner folder
-        files_query = f"'{runner_folder_id}' in parents and trashed=false"
-        files_results = drive_service.files().list(q=files_query, fields='files(id, name, webViewLink, mimeType)').execute()
-        files = files_results.get('files', [])
-
         if not files:
             print(f"❌ DEBUG: No files found in Runner folder")
             return
@@ -1196,26 +1400,6 @@ async def search_and_share_runner_info(guild):
 
         print(f"✅ DEBUG: Found target channel: #{target_channel.name}")
 
-        # Delete old pinned runner info messages from the bot
-        pinned_messages = await safe_call(target_channel.pins())
-        deleted_count = 0
-        
-        for message in pinned_messages:
-            # Check if this is a runner info message sent by the bot
-            if message.author == bot.user and message.embeds:
-                if message.embeds[0].title and "🏃 Runner Information & Resources" in message.embeds[0].title:
-                    try:
-                        await message.delete()
-                        deleted_count += 1
-                        print(f"🗑️ Deleted old pinned runner info message from #{target_channel.name}")
-                        # Small delay to avoid rate limiting
-                        await asyncio.sleep(0.2)
-                    except Exception as delete_error:
-                        print(f"⚠️ Could not delete runner info message in #{target_channel.name}: {delete_error}")
-        
-        if deleted_count > 0:
-            print(f"✅ Cleaned up {deleted_count} old runner info message(s)")
-
         # Create embed for the runner info
         embed = discord.Embed(
             title="🏃 Runner Information & Resources",
@@ -1268,51 +1452,88 @@ async def search_and_share_runner_info(guild):
         if current_chunk.strip():
             chunks.append(current_chunk.strip())
 
-        # Send the first message with the main embed
+        # The first message carries the main embed, remaining chunks become continuation messages
         embed.add_field(name="📋 Runner Info", value=chunks[0] if chunks else "No files found", inline=False)
-        message = await target_channel.send(embed=embed)
-        print(f"🏃 Shared runner info in #{target_channel.name}")
+        embeds = [embed]
+        for i, chunk in enumerate(chunks[1:], start=2):
+            continuation_embed = discord.Embed(
+                title=f"🏃 Runner Information & Resources (continued {i})",
+                description="",
+                color=discord.Color.blue()
+            )
+            continuation_embed.add_field(name="📋 Runner Info", value=chunk, inline=False)
+            embeds.append(continuation_embed)
 
-        # Pin the first message
-        try:
-            await safe_call(message.pin())
-            print(f"📌 Pinned runner info message in #{target_channel.name}")
-        except discord.Forbidden:
-            print(f"⚠️ No permission to pin message in #{target_channel.name}")
-        except Exception as pin_error:
-            print(f"⚠️ Error pinning message in #{target_channel.name}: {pin_error}")
-
-        # Send additional messages for remaining chunks
-        if len(chunks) > 1:
-            for i, chunk in enumerate(chunks[1:], start=2):
-                continuation_embed = discord.Embed(
-                    title=f"🏃 Runner Information & Resources (continued {i})",
-                    description="",
-                    color=discord.Color.blue()
-                )
-                continuation_embed.add_field(name="📋 Runner Info", value=chunk, inline=False)
-                await target_channel.send(embed=continuation_embed)
-                print(f"🏃 Sent continuation message {i} for runner info")
-                await asyncio.sleep(0.5)
+        # Edit the registered messages in place instead of deleting and reposting them
+        status = await sync_registered_message_chunks(
+            target_channel, "runner_info", embeds, legacy_title="🏃 Runner Information & Resources"
+        )
+        print(f"🏃 Runner Info in #{target_channel.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error searching for Runner folder: {e}")
 
+def runner_text_overwrite():
+    """Overwrite given to the Runner role on text channels it should see"""
+    return discord.PermissionOverwrite(
+        read_messages=True,
+        send_messages=True,
+        read_message_history=True
+    )
+
+def runner_forum_overwrite():
+    """Overwrite given to the Runner role on forum channels it should see"""
+    return discord.PermissionOverwrite(
+        read_messages=True,
+        send_messages=True,
+        read_message_history=True,
+        create_public_threads=True,
+        send_messages_in_threads=True
+    )
+
+async def apply_channel_overwrite_edits(pending_edits):
+    """
+    Apply queued channel overwrite edits one after another through the rate-limited path.
+
+    Args:
+        pending_edits: List of (channel, overwrites, reason, operation_name) tuples
+
+    Returns:
+        Channels whose edit went through (edits still rate limited after the retries are left out)
+    """
+    applied = []
+    for channel, overwrites, reason, operation_name in pending_edits:
+        try:
+            result = await handle_rate_limit(
+                channel.edit(overwrites=overwrites, reason=reason),
+                operation_name
+            )
+            if result is None:
+                continue
+            applied.append(channel)
+        except discord.Forbidden:
+            print(f"❌ No permission to edit channel permissions for #{channel.name}")
+        except Exception as e:
+            print(f"❌ Error updating channel permissions for #{channel.name}: {e}")
+    return applied
+
 async def add_runner_access(channel, runner_role):
-    """Add Runner role access to a channel"""
+    """Add Runner role access to a channel. Returns True if the channel was edited, False if it was already correct"""
     if not channel or not runner_role:
-        return
+        return False
 
     try:
+        desired = runner_text_overwrite()
+
+        # Skip the edit entirely if the overwrite is already exactly right
+        if channel.overwrites_for(runner_role) == desired:
+            return False
+
         # Get current overwrites
         overwrites = channel.overwrites
 
         # Add Runner role with full permissions
-        overwrites[runner_role] = discord.PermissionOverwrite(
-            read_messages=True,
-            send_messages=True,
-            read_message_history=True
-        )
+        overwrites[runner_role] = desired
 
         # Update channel permissions
         await handle_rate_limit(
@@ -1320,11 +1541,13 @@ async def add_runner_access(channel, runner_role):
             f"editing channel '{channel.name}' permissions"
         )
         print(f"🔑 Added {runner_role.name} access to #{channel.name}")
+        return True
 
     except discord.Forbidden:
         print(f"❌ No permission to edit channel permissions for #{channel.name}")
     except Exception as e:
         print(f"❌ Error updating channel permissions for #{channel.name}: {e}")
+    return False
 
 async def ensure_runner_tournament_officials_access(guild, runner_role):
     """Ensure Runner role has access to Tournament Officials channels"""
@@ -1343,19 +1566,22 @@ async def ensure_runner_tournament_officials_access(guild, runner_role):
     official_channels = ["runner", "scoring", "awards-ceremony"]
 
     added_count = 0
+    unchanged_count = 0
     for channel_name in official_channels:
         channel = discord.utils.get(guild.text_channels, name=channel_name)
         if channel and channel.category == tournament_officials_category:
             try:
-                await add_runner_access(channel, runner_role)
-                added_count += 1
+                if await add_runner_access(channel, runner_role):
+                    added_count += 1
+                else:
+                    unchanged_count += 1
             except Exception as e:
                 print(f"❌ Error adding Runner access to #{channel_name}: {e}")
 
-    print(f"✅ Added {runner_role.name} access to {added_count} Tournament Officials channels")
+    print(f"✅ Added {runner_role.name} access to {added_count} Tournament Officials channels ({unchanged_count} already correct)")
 
 async def send_building_welcome_message(guild, building_chat, building):
-    """Send an initial welcome message to a building chat with all events in that building"""
+    """Post or update a building chat's welcome message listing all events in that building"""
     if not building_chat or not building:
         return
 
@@ -1396,19 +1622,11 @@ async def send_building_welcome_message(guild, building_chat, building):
 
         embed.set_footer(text="Each event also has its own dedicated channel for event-specific discussions.")
 
-        # Send the message
-        message = await building_chat.send(embed=embed)
-        await asyncio.sleep(0.5)
-        print(f"🏢 Sent welcome message to #{building_chat.name} for building '{building}'")
-
-        # Pin the message so it's always visible
-        try:
-            await safe_call(message.pin())
-            print(f"📌 Pinned welcome message in #{building_chat.name}")
-        except discord.Forbidden:
-            print(f"⚠️ Could not pin welcome message in #{building_chat.name} (missing permissions)")
-        except Exception as e:
-            print(f"⚠️ Error pinning welcome message in #{building_chat.name}: {e}")
+        # Post (and pin) the message, or edit the registered one if the events changed
+        status = await post_or_update_registered_message(
+            building_chat, "building_welcome", embed, pin=True, legacy_title="🏢 Welcome to"
+        )
+        print(f"🏢 Welcome message for building '{building}' in #{building_chat.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error sending welcome message to #{building_chat.name}: {e}")
@@ -1564,15 +1782,6 @@ async def reset_server_for_guild(guild):
 async def post_welcome_instructions(welcome_channel):
     """Post welcome instructions and login information to the welcome channel"""
     try:
-        # Check if there are already messages in the channel
-        async for message in welcome_channel.history(limit=10):
-            # If there are messages, check if any are from the bot with the welcome embed
-            if message.author == bot.user and message.embeds:
-                for embed in message.embeds:
-                    if embed.title and "Welcome to the Science Olympiad Server" in embed.title:
-                        print(f"✅ Welcome instructions already posted in #{welcome_channel.name}")
-                        return
-
         # Create welcome embed
         embed = discord.Embed(
             title="🎉 Welcome to the Science Olympiad Server!",
@@ -1623,9 +1832,12 @@ async def post_welcome_instructions(welcome_channel):
 
         embed.set_footer(text="Use /login to get started! • Questions? Ask in volunteer channels")
 
-        # Send the welcome message
-        await welcome_channel.send(embed=embed)
-        print(f"📋 Posted welcome instructions to #{welcome_channel.name}")
+        # Post the welcome message, or edit the registered one only if its content changed
+        status = await post_or_update_registered_message(
+            welcome_channel, "welcome_instructions", embed,
+            legacy_title="Welcome to the Science Olympiad Server"
+        )
+        print(f"📋 Welcome instructions in #{welcome_channel.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error posting welcome instructions: {e}")
@@ -1633,14 +1845,6 @@ async def post_welcome_instructions(welcome_channel):
 async def post_welcome_tldr(welcome_channel):
     """Post welcome instructions and login information to the welcome channel"""
     try:
-        # Check if TLDR message already exists
-        async for message in welcome_channel.history(limit=10):
-            if message.author == bot.user and message.embeds:
-                for embed in message.embeds:
-                    if embed.title and "TLDR: TYPE" in embed.title:
-                        print(f"✅ Welcome TLDR already posted in #{welcome_channel.name}")
-                        return
-
         # Create welcome embed
         embed = discord.Embed(
             title="TLDR: TYPE `/login` TO GET STARTED",
@@ -1648,9 +1852,11 @@ async def post_welcome_tldr(welcome_channel):
             color=discord.Color.blue()
         )
 
-        # Send the welcome message
-        await welcome_channel.send(embed=embed)
-        print(f"📋 Posted welcome tldr to #{welcome_channel.name}")
+        # Post the TLDR, or edit the registered one only if its content changed
+        status = await post_or_update_registered_message(
+            welcome_channel, "welcome_tldr", embed, legacy_title="TLDR: TYPE"
+        )
+        print(f"📋 Welcome tldr in #{welcome_channel.name}: {status}")
 
     except Exception as e:
         print(f"❌ Error posting welcome tldr: {e}")
@@ -2014,7 +2220,28 @@ async def move_bot_role_to_top_for_guild(guild):
     except Exception as e:
         print(f"❌ Error moving bot role to top: {e}")
 
-async def organize_role_hierarchy_for_guild(guild):
+def load_role_hierarchy_fingerprints():
+    """Load the stored role hierarchy fingerprints on first use"""
+    global role_hierarchy_fingerprints
+    if role_hierarchy_fingerprints is None:
+        role_hierarchy_fingerprints = {int(guild_id): fingerprint for guild_id, fingerprint in state_store.get_all("role_fingerprints").items()}
+    return role_hierarchy_fingerprints
+
+async def save_role_hierarchy_fingerprint(guild_id, fingerprint):
+    """Remember a guild's role hierarchy fingerprint across restarts"""
+    load_role_hierarchy_fingerprints()[guild_id] = fingerprint
+    await state_store.upsert("role_fingerprints", guild_id, fingerprint)
+
+def compute_role_hierarchy_fingerprint(guild, position_overrides=None):
+    """Fingerprint the guild's role set and order, optionally with planned position changes applied"""
+    position_overrides = position_overrides or {}
+    entries = sorted(
+        (position_overrides.get(role, role.position), role.id, role.name, role.name in chapter_role_names)
+        for role in guild.roles
+    )
+    return hashlib.sha256(repr(entries).encode()).hexdigest()
+
+async def organize_role_hierarchy_for_guild(guild, force=False):
     """Organize roles in priority order: lambot, Admin, Runner, Arbitrations, Photographer, Social Media, Lead ES, Volunteer, then others"""
     if not guild:
         print("❌ Guild not provided!")
@@ -2027,6 +2254,16 @@ async def organize_role_hierarchy_for_guild(guild):
         print("💡 Please give the bot 'Manage Roles' permission in Server Settings → Roles")
         return
 
+    # Skip entirely if no role was created/deleted/renamed/moved since the last reorganization
+    fingerprint = compute_role_hierarchy_fingerprint(guild)
+    if not force and load_role_hierarchy_fingerprints().get(guild.id) == fingerprint:
+        role_hierarchy_stats["skipped"] += 1
+        print(f"⏭️ Role hierarchy unchanged for {guild.name}, skipping reorganization "
+              f"({role_hierarchy_stats['executed']} executed / {role_hierarchy_stats['skipped']} skipped)")
+        return
+
+    role_hierarchy_stats["forced" if force else "executed"] += 1
+
     # Define the priority order (higher index = higher priority/position)
     priority_roles = [
         "Volunteer",  # Lowest priority
@@ -2100,17 +2337,19 @@ async def organize_role_hierarchy_for_guild(guild):
         final_order = other_roles + chapter_roles + priority_role_objects
 
         # Update positions (start from position 1, @everyone stays at 0)
-        position = 1
-        moved_count = 0
-        rate_limited_roles = []
-
-        role_positions = {}
-        for role in final_order:
-            role_positions[role] = position
-            position += 1
+        # Only roles that are out of place are sent, all in one bulk call
+        role_positions = plan_position_changes(final_order, range(1, len(final_order) + 1))
+
+        if not role_positions:
+            await save_role_hierarchy_fingerprint(guild.id, fingerprint)
+            print("ℹ️ No roles needed to be moved (already in correct positions)")
+            return
+
         try:
             await safe_call(guild.edit_role_positions(role_positions, reason="Organizing role hierarchy"))
-            print(f"✅ Successfully moved all roles!")
+            # Remember the order we just asked for; the gateway cache catches up with it shortly
+            await save_role_hierarchy_fingerprint(guild.id, compute_role_hierarchy_fingerprint(guild, role_positions))
+            print(f"✅ Successfully moved {len(role_positions)} role(s) with 1 bulk update!")
         except Exception as e:
             print(f"⚠️ Unexpected error moving roles: {e}")
 
@@ -2207,30 +2446,35 @@ async def remove_runner_access_from_building_channels_for_guild(guild):
 
     print(f"🚫 Removing {runner_role.name} access from building/event channels...")
 
-    removed_count = 0
+    pending_edits = []
+    unchanged_count = 0
 
-    # Remove access from building/event channels
+    # Only channels that actually carry a Runner overwrite need an edit
     for channel in guild.text_channels:
         if channel.category:
             # Remove access from channels that are NOT in static categories
             if channel.category.name not in ["Welcome", "Tournament Officials", "Volunteers"]:
-                try:
-                    # Check if Runner role has access to this channel
-                    overwrites = channel.overwrites
-                    if runner_role in overwrites:
-                        # Remove the Runner role from overwrites
-                        del overwrites[runner_role]
-                        await handle_rate_limit(
-                            channel.edit(overwrites=overwrites, reason=f"Removed {runner_role.name} access from building channel"),
-                            f"removing access from channel '{channel.name}'"
-                        )
-                        removed_count += 1
-                        print(f"🚫 Removed {runner_role.name} access from #{channel.name}")
+                overwrites = channel.overwrites
+                if runner_role not in overwrites:
+                    unchanged_count += 1
+                    continue
 
-                except Exception as e:
-                    print(f"❌ Error removing Runner access from #{channel.name}: {e}")
+                # Remove the Runner role from overwrites
+                del overwrites[runner_role]
+                pending_edits.append((
+                    channel,
+                    overwrites,
+                    f"Removed {runner_role.name} access from building channel",
+                    f"removing access from channel '{channel.name}'"
+                ))
+
+    removed = await apply_channel_overwrite_edits(pending_edits)
+    for channel in removed:
+        print(f"🚫 Removed {runner_role.name} access from #{channel.name}")
+    removed_count = len(removed)
 
-    print(f"✅ Removed {runner_role.name} access from {removed_count} building/event channels")
+    print(f"✅ Removed {runner_role.name} access from {removed_count} building/event channels ({unchanged_count} already correct, no-op)")
+    return {"edited": removed_count, "unchanged": unchanged_count}
 
 async def give_runner_access_to_all_channels_for_guild(guild):
     """Give Runner role access only to static channels (not building/event channels)"""
@@ -2245,75 +2489,66 @@ async def give_runner_access_to_all_channels_for_guild(guild):
 
     print(f"🔑 Adding {runner_role.name} access to static channels only...")
 
-    welcome_channels = 0
-    tournament_official_channels = 0
-    volunteer_channels = 0
+    static_categories = ["Welcome", "Tournament Officials", "Volunteers"]
+    edited_per_category = {name: 0 for name in static_categories}
     forum_channels = 0
+    unchanged_count = 0
+    pending_edits = []
 
-    # Add access to all channels in specific categories
+    # Queue an edit only for static text channels whose Runner overwrite differs
+    text_overwrite = runner_text_overwrite()
     for channel in guild.text_channels:
-        if channel.category:
-            if channel.category.name == "Welcome":
-                try:
-                    await add_runner_access(channel, runner_role)
-                    welcome_channels += 1
-                    print(f"🔑 Added {runner_role.name} access to #{channel.name} (Welcome)")
-                except Exception as e:
-                    print(f"❌ Error adding Runner access to #{channel.name}: {e}")
-
-            elif channel.category.name == "Tournament Officials":
-                try:
-                    await add_runner_access(channel, runner_role)
-                    tournament_official_channels += 1
-                    print(f"🔑 Added {runner_role.name} access to #{channel.name} (Tournament Officials)")
-                except Exception as e:
-                    print(f"❌ Error adding Runner access to #{channel.name}: {e}")
-
-            # elif channel.category.name == "Chapters":
-            #     try:
-            #         await add_runner_access(channel, runner_role)
-            #         volunteer_channels += 1
-            #         print(f"🔑 Added {runner_role.name} access to #{channel.name} (Chapters)")
-            #     except Exception as e:
-            #         print(f"❌ Error adding Runner access to #{channel.name}: {e}")
-
-            elif channel.category.name == "Volunteers":
-                try:
-                    await add_runner_access(channel, runner_role)
-                    volunteer_channels += 1
-                    print(f"🔑 Added {runner_role.name} access to #{channel.name} (Volunteers)")
-                except Exception as e:
-                    print(f"❌ Error adding Runner access to #{channel.name}: {e}")
+        if channel.category and channel.category.name in static_categories:
+            if channel.overwrites_for(runner_role) == text_overwrite:
+                unchanged_count += 1
+                continue
 
-    # Add access to forum channels in static categories
+            overwrites = channel.overwrites
+            overwrites[runner_role] = text_overwrite
+            pending_edits.append((
+                channel,
+                overwrites,
+                f"Added {runner_role.name} access to all channels",
+                f"editing channel '{channel.name}' permissions"
+            ))
+
+    # Same for forum channels in static categories
+    forum_overwrite = runner_forum_overwrite()
     for channel in guild.channels:
         if channel.type == discord.ChannelType.forum and channel.category:
-            if channel.category.name in ["Welcome", "Tournament Officials", "Volunteers"]:
-                try:
-                    overwrites = channel.overwrites
-                    overwrites[runner_role] = discord.PermissionOverwrite(
-                        read_messages=True,
-                        send_messages=True,
-                        read_message_history=True,
-                        create_public_threads=True,
-                        send_messages_in_threads=True
-                    )
-                    await handle_rate_limit(
-                        channel.edit(overwrites=overwrites, reason=f"Added {runner_role.name} access"),
-                        f"editing forum channel '{channel.name}' permissions"
-                    )
-                    print(f"🔑 Added {runner_role.name} access to #{channel.name} (forum in {channel.category.name})")
-                    forum_channels += 1
-                except Exception as e:
-                    print(f"❌ Error adding Runner access to forum #{channel.name}: {e}")
+            if channel.category.name in static_categories:
+                if channel.overwrites_for(runner_role) == forum_overwrite:
+                    unchanged_count += 1
+                    continue
+
+                overwrites = channel.overwrites
+                overwrites[runner_role] = forum_overwrite
+                pending_edits.append((
+                    channel,
+                    overwrites,
+                    f"Added {runner_role.name} access",
+                    f"editing forum channel '{channel.name}' permissions"
+                ))
+
+    # Count and log only the edits that went through
+    edited = await apply_channel_overwrite_edits(pending_edits)
+    for channel in edited:
+        if channel.type == discord.ChannelType.forum:
+            forum_channels += 1
+            print(f"🔑 Added {runner_role.name} access to #{channel.name} (forum in {channel.category.name})")
+        else:
+            edited_per_category[channel.category.name] += 1
+            print(f"🔑 Added {runner_role.name} access to #{channel.name} ({channel.category.name})")
+    edited_count = len(edited)
 
     print(f"✅ Added {runner_role.name} access to:")
-    print(f"   • {welcome_channels} Welcome channels")
-    print(f"   • {tournament_official_channels} Tournament Officials channels")
-    print(f"   • {volunteer_channels} Volunteers channels")
+    print(f"   • {edited_per_category['Welcome']} Welcome channels")
+    print(f"   • {edited_per_category['Tournament Officials']} Tournament Officials channels")
+    print(f"   • {edited_per_category['Volunteers']} Volunteers channels")
     print(f"   • {forum_channels} forum channels")
-    print(f"🔑 Total: {welcome_channels + tournament_official_channels + volunteer_channels + forum_channels} channels with Runner access")
+    print(f"🔑 Total: {edited_count} channels edited, {unchanged_count} already correct (no-op)")
     print(f"🚫 Building/event channels are restricted to event participants only")
+    return {"edited": edited_count, "unchanged": unchanged_count}
 
 async def setup_ezhang_admin_role(guild):
     """Set up admin role for ezhang. if they're in the server"""
@@ -2355,19 +2590,62 @@ async def setup_ezhang_admin_role(guild):
         except Exception as e:
             print(f"⚠️ Could not grant admin privileges to ezhang. in {guild.name}: {e}")
 
-@bot.event
-async def on_ready():
-    global runner_all_access
-    async with admin_lock:
+def compute_guild_structure_fingerprint(guild):
+    """Fingerprint a guild's roles, categories, channels and overwrites from the gateway cache (no API calls)"""
+    roles = [
+        (role.id, role.name, role.position, role.permissions.value, role.color.value)
+        for role in sorted(guild.roles, key=lambda r: r.id)
+    ]
 
-        print(f"Logged in as {bot.user} (ID: {bot.user.id})")
-        print(f"🌐 Bot is active in {len(bot.guilds)} guild(s):")
-        for guild in bot.guilds:
-            print(f"  • {guild.name} (ID: {guild.id}) - {guild.member_count} members")
+    channels = []
+    for channel in sorted(guild.channels, key=lambda c: c.id):
+        overwrites = sorted(
+            (target.id, overwrite.pair()[0].value, overwrite.pair()[1].value)
+            for target, overwrite in channel.overwrites.items()
+        )
+        channels.append((channel.id, channel.name, str(channel.type), getattr(channel, "category_id", None), channel.position, overwrites))
+
+    payload = json.dumps({
+        "version": STARTUP_SETUP_VERSION,
+        "runner_all_access": runner_all_access,
+        "roles": roles,
+        "channels": channels,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def load_setup_fingerprint(guild_id):
+    """Get the structure fingerprint stored after a guild's last complete setup"""
+    return await state_store.fetch("setup_fingerprints", guild_id)
+
+async def save_setup_fingerprint(guild_id, fingerprint):
+    """Persist a guild's structure fingerprint after a complete setup"""
+    await state_store.upsert("setup_fingerprints", guild_id, fingerprint)
+
+async def record_setup_fingerprint(guild):
+    """Fingerprint a guild once the gateway cache has caught up with the setup's own edits"""
+    try:
+        await asyncio.sleep(SETUP_FINGERPRINT_SETTLE_SECONDS)
+        await save_setup_fingerprint(guild.id, compute_guild_structure_fingerprint(guild))
+        print(f"🧬 Stored structure fingerprint for {guild.name}")
+    except Exception as e:
+        # The guild is already set up; it just gets the full setup again on the next start
+        print(f"⚠️ Could not record setup fingerprint for {guild.name}: {e}")
+
+async def setup_guild_on_startup(guild, semaphore):
+    """Run the startup setup for one guild, holding a slot of the shared setup budget"""
+    async with semaphore, get_admin_lock(guild.id):
+        guild_setup_status[guild.id] = "running"
+        started_at = datetime.now()
+        print(f"\n🏗️ Setting up guild: {guild.name} (ID: {guild.id})")
 
-        # Process each guild the bot is in
-        for guild in bot.guilds:
-            print(f"\n🏗️ Setting up guild: {guild.name} (ID: {guild.id})")
+        try:
+            # Warm restart: nothing changed since the last complete setup, so skip the setup passes
+            if not RESET_SERVER and await load_setup_fingerprint(guild.id) == compute_guild_structure_fingerprint(guild):
+                await setup_ezhang_admin_role(guild)
+                guild_setup_status[guild.id] = "ready"
+                elapsed = (datetime.now() - started_at).total_seconds()
+                print(f"⚡ {guild.name} is unchanged since its last setup, skipped setup passes ({elapsed:.1f}s)")
+                return
 
             # Check if server reset is enabled for this guild
             if RESET_SERVER:
@@ -2375,46 +2653,97 @@ async def on_ready():
                 await reset_server_for_guild(guild)
                 print(f"🔄 Reset complete for {guild.name}, continuing with setup...")
 
-            try:
-                print(f"🏗️ Setting up static channels for {guild.name}...")
-                await setup_static_channels_for_guild(guild)
-                print(f"🤖 Moving bot role to top for {guild.name}...")
-                await move_bot_role_to_top_for_guild(guild)
-                print(f"🎭 Organizing role hierarchy for {guild.name}...")
-                await organize_role_hierarchy_for_guild(guild)
-                if not runner_all_access:
-                    print(f"🚫 Removing Runner access from building channels for {guild.name}...")
-                    await remove_runner_access_from_building_channels_for_guild(guild)
-                print(f"🔑 Adding Runner access to static channels for {guild.name}...")
-                await give_runner_access_to_all_channels_for_guild(guild)
+            print(f"🏗️ Setting up static channels for {guild.name}...")
+            await setup_static_channels_for_guild(guild)
+            print(f"🤖 Moving bot role to top for {guild.name}...")
+            await move_bot_role_to_top_for_guild(guild)
+            print(f"🎭 Organizing role hierarchy for {guild.name}...")
+            await organize_role_hierarchy_for_guild(guild)
+            if not runner_all_access:
+                print(f"🚫 Removing Runner access from building channels for {guild.name}...")
+                await remove_runner_access_from_building_channels_for_guild(guild)
+            print(f"🔑 Adding Runner access to static channels for {guild.name}...")
+            await give_runner_access_to_all_channels_for_guild(guild)
 
-                # Check if ezhang. is already in this server and give them the Admin role
-                await setup_ezhang_admin_role(guild)
+            # Check if ezhang. is already in this server and give them the Admin role
+            await setup_ezhang_admin_role(guild)
 
-            except Exception as e:
-                print(f"❌ Error setting up guild {guild.name}: {e}")
+            guild_setup_status[guild.id] = "ready"
+            elapsed = (datetime.now() - started_at).total_seconds()
+            print(f"✅ Guild {guild.name} is ready ({elapsed:.1f}s), commands unlocked")
 
-        # Try to load spreadsheet connections from cache (per-guild)
-        print("\n💾 Attempting to load cached spreadsheet connections...")
-        cache_loaded = await load_spreadsheets_from_cache()
-        if cache_loaded:
-            print("✅ Successfully loaded spreadsheet connections from cache!")
-        else:
-            print("📋 No cached connections available - use /enterfolder to connect to a sheet")
+        except Exception as e:
+            # Don't keep the guild's commands locked because setup failed
+            guild_setup_status[guild.id] = "failed"
+            print(f"❌ Error setting up guild {guild.name}: {e}")
+            return
+
+    # Only a complete setup is fingerprinted, so a failed one is retried on the next start
+    await record_setup_fingerprint(guild)
 
+@bot.event
+async def on_ready():
+    global ticket_scheduler_task
+
+    print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    print(f"🌐 Bot is active in {len(bot.guilds)} guild(s):")
+    for guild in bot.guilds:
+        print(f"  • {guild.name} (ID: {guild.id}) - {guild.member_count} members")
+
+    # on_ready fires again after reconnects; only guilds that never finished setup need it
+    pending_guilds = [guild for guild in bot.guilds if guild_setup_status.get(guild.id) != "ready"]
+    for guild in pending_guilds:
+        guild_setup_status[guild.id] = "pending"
+
+    # Set up guilds concurrently under a shared budget, and load cached sheets alongside them
+    print(f"\n🏗️ Setting up {len(pending_guilds)} guild(s), {GUILD_SETUP_CONCURRENCY} at a time...")
+    print("💾 Loading cached spreadsheet connections in parallel...")
+    started_at = datetime.now()
+    semaphore = asyncio.Semaphore(GUILD_SETUP_CONCURRENCY)
+    # One guild's failure must not skip the cache load or the other guilds
+    cache_loaded, *setup_results = await asyncio.gather(
+        load_spreadsheets_from_cache(),
+        *(setup_guild_on_startup(guild, semaphore) for guild in pending_guilds),
+        return_exceptions=True
+    )
+    for guild, result in zip(pending_guilds, setup_results):
+        if isinstance(result, Exception):
+            guild_setup_status[guild.id] = "failed"
+            print(f"❌ Error setting up guild {guild.name}: {result}")
+    if isinstance(cache_loaded, Exception):
+        print(f"❌ Error loading cached spreadsheet connections: {cache_loaded}")
+        cache_loaded = False
+
+    if cache_loaded:
+        print("✅ Successfully loaded spreadsheet connections from cache!")
+        # Lookups are served from the persisted snapshots right away; revalidate them in the background
+        for guild_id in list(spreadsheets):
+            schedule_guild_state_refresh(guild_id)
+    else:
+        print("📋 No cached connections available - use /enterfolder to connect to a sheet")
+
+    ready_count = sum(1 for guild in pending_guilds if guild_setup_status.get(guild.id) == "ready")
+    elapsed = (datetime.now() - started_at).total_seconds()
+    print(f"🏁 Startup finished in {elapsed:.1f}s: {ready_count}/{len(pending_guilds)} guild(s) ready")
+
+    if not sync_members.is_running():
         print("🔄 Starting member sync task...")
         sync_members.start()
 
-        print("🎫 Starting help ticket monitoring task...")
-        check_help_tickets.start()
+    if ticket_scheduler_task is None:
+        # Pick up tickets that were open when the bot last stopped
+        await restore_help_tickets()
+        print("🎫 Starting help ticket scheduler...")
+        ticket_scheduler_task = asyncio.create_task(run_ticket_scheduler())
 
 @bot.event
 async def on_guild_join(guild):
     """Handle setup when bot joins a new guild"""
     global runner_all_access
-    async with admin_lock:
+    async with guild_admin_session(guild.id):
 
         print(f"🎉 Bot joined new guild: {guild.name} (ID: {guild.id}) - {guild.member_count} members")
+        guild_setup_status[guild.id] = "running"
 
         try:
             print(f"🏗️ Setting up new guild: {guild.name}")
@@ -2440,9 +2769,15 @@ async def on_guild_join(guild):
             await give_runner_access_to_all_channels_for_guild(guild)
             await setup_ezhang_admin_role(guild)
 
+            guild_setup_status[guild.id] = "ready"
             print(f"✅ Successfully set up new guild: {guild.name}")
+            # Keep a reference so the pending task isn't garbage-collected before it runs
+            task = asyncio.create_task(record_setup_fingerprint(guild))
+            setup_fingerprint_tasks.add(task)
+            task.add_done_callback(setup_fingerprint_tasks.discard)
 
         except Exception as e:
+            guild_setup_status[guild.id] = "failed"
             print(f"❌ Error setting up new guild {guild.name}: {e}")
 
 @bot.event
@@ -2518,65 +2853,724 @@ async def on_member_join(member):
         del pending_users[member.id]
 
 
-async def get_user_event_building(guild_id, discord_id):
-    """Look up a user's event and building from the main sheet"""
-    if guild_id not in spreadsheets:
-        print(f"❌ No spreadsheet connected for guild {guild_id}")
-        return None
+def get_drive_service():
+    """Get the calling thread's shared Drive API service instead of rebuilding it for every lookup"""
+    service = getattr(_drive_local, "service", None)
+    if service is None:
+        from googleapiclient.discovery import build
+        service = build('drive', 'v3', credentials=creds)
+        _drive_local.service = service
+    return service
+
+def drive_files_list_request(q, fields, page_token=None, order_by=None):
+    """
+    Build (without executing) the files().list request for one page of a Drive query.
+
+    Args:
+        q: Drive search query
+        fields: File fields to return (e.g. "id, name"); nothing else is requested
+        page_token: nextPageToken of the previous page, if any
+        order_by: Optional Drive sort order (e.g. "name")
+    """
+    request = {"q": q, "fields": f"nextPageToken, files({fields})", "pageSize": DRIVE_PAGE_SIZE}
+    if page_token:
+        request["pageToken"] = page_token
+    if order_by:
+        request["orderBy"] = order_by
+    return get_drive_service().files().list(**request)
+
+def list_drive_files_page(q, fields, page_token=None, order_by=None):
+    """
+    Fetch one page of a Drive files().list query (blocking).
+
+    Returns:
+        (files, next_page_token) with next_page_token None on the last page
+    """
+    response = drive_files_list_request(q, fields, page_token, order_by).execute()
+    return response.get('files', []), response.get('nextPageToken')
+
+def execute_drive_batch(requests):
+    """
+    Run independent Drive requests as batch HTTP calls (blocking), DRIVE_BATCH_SIZE per round-trip.
+
+    Args:
+        requests: Dict name (str) -> unexecuted request built on this thread's get_drive_service()
+
+    Returns:
+        Dict name -> response, or the exception that sub-request failed with
+    """
+    results = {}
+    items = list(requests.items())
+    for start in range(0, len(items), DRIVE_BATCH_SIZE):
+        chunk = items[start:start + DRIVE_BATCH_SIZE]
+        if len(chunk) == 1:
+            # A lone request goes out as is, without the batch envelope
+            name, request = chunk[0]
+            try:
+                results[name] = request.execute()
+            except Exception as e:
+                results[name] = e
+            continue
 
+        def _store(request_id, response, exception):
+            results[request_id] = exception if exception is not None else response
+
+        batch = get_drive_service().new_batch_http_request(callback=_store)
+        for name, request in chunk:
+            batch.add(request, request_id=name)
+        batch.execute()
+    return results
+
+def list_drive_files_batch(queries, order_by=None):
+    """
+    Run several Drive listing queries together (blocking): the first page of every query goes
+    out in one batch round-trip, then the next pages of those that have more, and so on.
+
+    Args:
+        queries: Dict name (str) -> (q, fields) as for drive_files_list_request
+        order_by: Optional Drive sort order for every query
+
+    Returns:
+        Dict name -> list of every matching file
+    """
+    results = {name: [] for name in queries}
+    pending = {name: None for name in queries}  # name -> page token of its next page
+    while pending:
+        responses = execute_drive_batch({
+            name: drive_files_list_request(*queries[name], page_token=token, order_by=order_by)
+            for name, token in pending.items()
+        })
+        pending = {}
+        for name, response in responses.items():
+            if isinstance(response, Exception):
+                raise response
+            results[name].extend(response.get('files', []))
+            if response.get('nextPageToken'):
+                pending[name] = response['nextPageToken']
+    return results
+
+def iter_drive_files(q, fields, order_by=None):
+    """Yield every file matching a Drive query, following nextPageToken (blocking)"""
+    page_token = None
+    while True:
+        files, page_token = list_drive_files_page(q, fields, page_token, order_by)
+        yield from files
+        if not page_token:
+            return
+
+async def aiter_drive_files(q, fields, order_by=None):
+    """
+    Yield every file matching a Drive query as its page arrives, without blocking the event loop.
+
+    The next page is already being fetched while the caller works through the current one;
+    stopping early fetches at most that one extra page.
+    """
+    pending = asyncio.create_task(asyncio.to_thread(list_drive_files_page, q, fields, None, order_by))
     try:
-        # Get the main worksheet
-        spreadsheet = spreadsheets[guild_id]
-        sheet = spreadsheet.worksheet(SHEET_PAGE_NAME)
-        data = sheet.get_all_records()
+        while pending is not None:
+            files, page_token = await pending
+            pending = asyncio.create_task(asyncio.to_thread(list_drive_files_page, q, fields, page_token, order_by)) if page_token else None
+            for file in files:
+                yield file
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+def runner_assignments_query(parent_folder_id):
+    """Drive query for a separate Runner Assignments spreadsheet in the template folder"""
+    return f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains 'Runner Assignments' and trashed=false"
+
+def open_runner_assignments_spreadsheet(spreadsheet_id):
+    """Open a separate Runner Assignments spreadsheet, preferring its Runner Assignments tab over the first tab (blocking)"""
+    runner_spreadsheet = gc.open_by_key(spreadsheet_id)
+    try:
+        return runner_spreadsheet.worksheet("Runner Assignments")
+    except Exception:
+        return runner_spreadsheet.sheet1
 
-        # Find the user by Discord ID
-        for row in data:
-            row_discord_id = str(row.get("Discord ID", "")).strip()
-            if not row_discord_id:
-                continue
+def find_runner_assignments_worksheet(spreadsheet, parent_folder_id=None):
+    """Find the Runner Assignments tab, or a separate spreadsheet of that name in the same Drive folder (blocking)"""
+    try:
+        return spreadsheet.worksheet("Runner Assignments")
+    except Exception:
+        pass
+
+    # If not found as a worksheet, search for a separate spreadsheet
+    if parent_folder_id is None:
+        sheet_metadata = get_drive_service().files().get(fileId=spreadsheet.id, fields='parents').execute()
+        parent_folders = sheet_metadata.get('parents', [])
+        if not parent_folders:
+            print("❌ Could not determine parent folder for Runner Assignments lookup")
+            return None
+        parent_folder_id = parent_folders[0]
+
+    runner_file = next(iter_drive_files(runner_assignments_query(parent_folder_id), 'id'), None)
+    if runner_file is None:
+        print("❌ Could not find Runner Assignments spreadsheet")
+        return None
+    return open_runner_assignments_spreadsheet(runner_file['id'])
+
+def get_runner_assignments_worksheet(guild_id):
+    """Get a guild's Runner Assignments worksheet, reusing the handle remembered in its state snapshot (blocking)"""
+    if guild_id in runner_worksheets:
+        return runner_worksheets[guild_id]
+
+    sheet = None
+    handle = (get_guild_state(guild_id) or {}).get("runner_worksheet")
+    if handle:
+        try:
+            sheet = gc.open_by_key(handle["spreadsheet_id"]).get_worksheet_by_id(handle["worksheet_id"])
+        except Exception as e:
+            print(f"⚠️ Remembered Runner Assignments worksheet is unavailable, searching again: {e}")
+
+    if sheet is None:
+        if guild_id not in spreadsheets:
+            return None
+        # The snapshot already knows the template folder, which saves a Drive lookup
+        state = get_guild_state(guild_id) or {}
+        parent_folder_id = state.get("parent_folder_id") if state.get("spreadsheet_id") == spreadsheets[guild_id].id else None
+        sheet = find_runner_assignments_worksheet(spreadsheets[guild_id], parent_folder_id)
+        if sheet is None:
+            return None
+
+    runner_worksheets[guild_id] = sheet
+    return sheet
+
+def load_guild_states():
+    """Load the per-guild state snapshots from the state store on first use"""
+    global guild_state
+    if guild_state is None:
+        guild_state = {}
+        outdated = []
+        for guild_id_str, state in state_store.get_all("state").items():
+            # Snapshots written by an older format are dropped and rebuilt
+            if state.get("version") == STATE_SNAPSHOT_VERSION:
+                guild_state[int(guild_id_str)] = state
+            else:
+                outdated.append(guild_id_str)
+        if outdated:
+            # Deleted rather than left behind (older formats stored full roster rows, passwords included)
+            state_store.delete_many("state", outdated)
+    return guild_state
+
+def get_guild_state(guild_id):
+    """Get a guild's state snapshot without touching Google"""
+    return load_guild_states().get(guild_id)
+
+async def save_guild_state(guild_id, state):
+    """Store a guild's state snapshot in memory and in the state store"""
+    state["version"] = STATE_SNAPSHOT_VERSION
+    load_guild_states()[guild_id] = state
+    guild_routing[guild_id] = build_routing_table(state)
+    await state_store.upsert("state", guild_id, state)
+
+def build_guild_state(guild_id, previous=None):
+    """
+    Build a guild's state snapshot from its sheets and Drive folder (blocking).
+
+    If the Drive versions of the main and runner spreadsheets haven't changed since the
+    previous snapshot, it is only marked as revalidated and no sheet data is reread.
+    """
+    spreadsheet = spreadsheets[guild_id]
+    drive_service = get_drive_service()
+    now = datetime.now().isoformat()
+    same_template = previous is not None and previous.get("spreadsheet_id") == spreadsheet.id
+
+    # The runner sheet is known from its opened worksheet or the previous snapshot's handle
+    runner_sheet = runner_worksheets.get(guild_id)
+    if runner_sheet is not None:
+        runner_handle = {"spreadsheet_id": runner_sheet.spreadsheet.id, "worksheet_id": runner_sheet.id}
+    else:
+        runner_handle = previous.get("runner_worksheet") if same_template else None
+
+    # Round-trip 1 (one batch): the main spreadsheet's version and folder, plus the runner
+    # spreadsheet's version, or a search for one if the last snapshot had none
+    requests = {"main": drive_service.files().get(fileId=spreadsheet.id, fields='version, parents')}
+    if runner_handle is not None and runner_handle["spreadsheet_id"] != spreadsheet.id:
+        requests["runner"] = drive_service.files().get(fileId=runner_handle["spreadsheet_id"], fields='version')
+    elif runner_handle is None and same_template and previous.get("parent_folder_id"):
+        requests["runner_search"] = drive_files_list_request(runner_assignments_query(previous["parent_folder_id"]), 'id, version')
+    responses = execute_drive_batch(requests)
+    main_metadata = responses["main"]
+    if isinstance(main_metadata, Exception):
+        raise main_metadata
+
+    runner_found = None  # Separate Runner Assignments spreadsheet found by the search
+    if runner_handle is None:
+        search = responses.get("runner_search")
+        found = search.get('files', []) if isinstance(search, dict) else []
+        runner_found = found[0] if found else None
+        runner_version = runner_found.get('version') if runner_found else None
+    elif runner_handle["spreadsheet_id"] == spreadsheet.id:
+        runner_version = main_metadata.get('version')
+    else:
+        # A runner spreadsheet that can't be read anymore counts as changed and is looked up again below
+        runner_metadata = responses["runner"]
+        runner_version = runner_metadata.get('version') if isinstance(runner_metadata, dict) else None
+    drive_version = {"main": main_metadata.get('version'), "runner": runner_version}
+    csv_path = WALKING_TIMES_CSV.format(guild_id=guild_id) if WALKING_TIMES_CSV else None
+    if csv_path and os.path.exists(csv_path):
+        drive_version["walking_csv"] = os.path.getmtime(csv_path)
+
+    if previous and previous.get("spreadsheet_id") == spreadsheet.id and previous.get("drive_version") == drive_version:
+        return {**previous, "validated_at": now}
+
+    parent_folders = main_metadata.get('parents', [])
+
+    # Open the runner sheet: the remembered one if it is still readable, else a tab of the main spreadsheet
+    if runner_handle is not None and runner_handle["spreadsheet_id"] != spreadsheet.id and runner_version is None:
+        print("⚠️ Remembered Runner Assignments spreadsheet is unavailable, searching again")
+        runner_worksheets.pop(guild_id, None)
+        runner_sheet = runner_handle = None
+    if runner_sheet is None and runner_handle is not None:
+        try:
+            runner_sheet = gc.open_by_key(runner_handle["spreadsheet_id"]).get_worksheet_by_id(runner_handle["worksheet_id"])
+        except Exception as e:
+            print(f"⚠️ Remembered Runner Assignments worksheet is unavailable, searching again: {e}")
+    if runner_sheet is None:
+        try:
+            runner_sheet = spreadsheet.worksheet("Runner Assignments")
+            runner_version = main_metadata.get('version')
+        except Exception:
+            pass
 
-            # Try to match Discord ID
+    # Round-trip 2 (one batch): the top-level Drive folder layout (Tests, Useful Links, Runner, ...),
+    # plus the search for a separate Runner Assignments spreadsheet if there still is no runner sheet
+    queries = {}
+    if parent_folders:
+        queries["folders"] = (f"'{parent_folders[0]}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false", 'id, name')
+        if runner_sheet is None and runner_found is None:
+            queries["runner_search"] = (runner_assignments_query(parent_folders[0]), 'id, version')
+    listings = list_drive_files_batch(queries) if queries else {}
+
+    folders = {}
+    for folder in listings.get("folders", []):
+        folders[folder['name']] = folder['id']
+
+    if runner_sheet is None:
+        runner_found = runner_found or next(iter(listings.get("runner_search", [])), None)
+        if runner_found is not None:
+            runner_sheet = open_runner_assignments_spreadsheet(runner_found['id'])
+            runner_version = runner_found.get('version')
+    if runner_sheet is not None:
+        runner_worksheets[guild_id] = runner_sheet
+    drive_version["runner"] = runner_version
+
+    main_sheet = sheets.get(guild_id) or spreadsheet.worksheet(SHEET_PAGE_NAME)
+    roster = roster_snapshot_rows(main_sheet.get_all_records())
+    runner_rows = runner_sheet.get_all_records() if runner_sheet is not None else []
+
+    # Building -> zone index (first row with a valid zone wins, like the old per-lookup scan)
+    building_zones = {}
+    for row in runner_rows:
+        building = str(row.get("Building", "")).strip().lower()
+        zone = row.get("Zone Number", "")
+        if building and zone and building not in building_zones:
             try:
-                if int(row_discord_id) == discord_id:
-                    # Found the user, extract their info
-                    event = str(row.get("First Event", "")).strip()
-                    building = str(row.get("Building 1", "")).strip()
-                    room = str(row.get("Room 1", "")).strip()
+                building_zones[building] = int(zone)
+            except (ValueError, TypeError):
+                print(f"⚠️ Invalid zone value '{zone}' for building '{building}'")
+
+    # Optional walking-time matrix, shared by zone clustering and ticket escalation
+    workbooks = [spreadsheet]
+    if runner_sheet is not None and runner_sheet.spreadsheet.id != spreadsheet.id:
+        workbooks.insert(0, runner_sheet.spreadsheet)
+    try:
+        walking_times = load_walking_time_matrix(guild_id, workbooks)
+    except ValueError as e:
+        print(f"⚠️ Ignoring walking-time matrix for guild {guild_id}: {e}")
+        walking_times = None
+
+    return {
+        "spreadsheet_id": spreadsheet.id,
+        "drive_version": drive_version,
+        "parent_folder_id": parent_folders[0] if parent_folders else None,
+        "folders": folders,
+        "runner_worksheet": {"spreadsheet_id": runner_sheet.spreadsheet.id, "worksheet_id": runner_sheet.id} if runner_sheet is not None else None,
+        "roster": roster,
+        "runner_rows": runner_rows,
+        "building_zones": building_zones,
+        "walking_times": walking_times,
+        "validated_at": now,
+    }
+
+async def refresh_guild_state(guild_id):
+    """Revalidate a guild's state snapshot against Google and store the result"""
+    if guild_id not in spreadsheets:
+        return get_guild_state(guild_id)
+
+    try:
+        state = await asyncio.to_thread(build_guild_state, guild_id, get_guild_state(guild_id))
+        await save_guild_state(guild_id, state)
+        return state
+    except Exception as e:
+        print(f"⚠️ Could not revalidate state snapshot for guild {guild_id}: {e}")
+        return get_guild_state(guild_id)
+
+def schedule_guild_state_refresh(guild_id):
+    """Revalidate a guild's state snapshot in the background (at most one refresh per guild at a time)"""
+    if guild_id in guild_state_refreshes:
+        return
+    task = asyncio.create_task(refresh_guild_state(guild_id))
+    guild_state_refreshes[guild_id] = task
+    task.add_done_callback(lambda _: guild_state_refreshes.pop(guild_id, None))
+
+async def get_current_guild_state(guild_id):
+    """Serve a guild's state snapshot right away, revalidating it in the background once it is stale"""
+    state = get_guild_state(guild_id)
+    if state is None or (guild_id in spreadsheets and state.get("spreadsheet_id") != spreadsheets[guild_id].id):
+        # Nothing usable to serve yet, so build it now
+        if guild_id not in spreadsheets:
+            return None
+        return await refresh_guild_state(guild_id)
+
+    age = (datetime.now() - datetime.fromisoformat(state["validated_at"])).total_seconds()
+    if age > STATE_REVALIDATE_SECONDS:
+        schedule_guild_state_refresh(guild_id)
+    return state
+
+ROSTER_SNAPSHOT_COLUMNS = ("Discord ID", "Email", "Name", "First Event", "Building 1", "Room 1")
+
+def roster_snapshot_rows(records):
+    """Trim roster rows to the columns routing uses, so passwords and other private columns are never persisted"""
+    return [{column: row.get(column, "") for column in ROSTER_SNAPSHOT_COLUMNS} for row in records]
+
+async def update_guild_roster(guild_id, data):
+    """Keep the roster in a guild's state snapshot current with freshly read sheet data"""
+    state = get_guild_state(guild_id)
+    roster = roster_snapshot_rows(data)
+    if state is not None and state.get("roster") != roster:
+        state["roster"] = roster
+        await save_guild_state(guild_id, state)
+
+def fetch_drive_folder_tree(root_folder_id):
+    """
+    Fetch everything below a Drive folder (blocking).
+
+    The tree is walked one level at a time, listing the children of every folder on that
+    level in one batch round-trip (a page per 1000 children), so a whole template folder
+    takes about one round-trip per level.
+
+    Returns:
+        Dict folder_id -> {"folders": {name: folder_id}, "items": [child dicts (files and folders) by name]}
+    """
+    tree = {root_folder_id: {"folders": {}, "items": []}}
+    level = [root_folder_id]
+    while level:
+        next_level = []
+        chunks = [level[start:start + DRIVE_PARENTS_PER_QUERY] for start in range(0, len(level), DRIVE_PARENTS_PER_QUERY)]
+        queries = {}
+        for i, chunk in enumerate(chunks):
+            parents_query = " or ".join(f"'{folder_id}' in parents" for folder_id in chunk)
+            queries[str(i)] = (f"({parents_query}) and trashed=false", 'id, name, mimeType, webViewLink, parents')
+        listings = list_drive_files_batch(queries, order_by='name')
+
+        for i, chunk in enumerate(chunks):
+            for item in listings[str(i)]:
+                is_folder = item.get('mimeType') == 'application/vnd.google-apps.folder'
+                for parent_id in item.get('parents', []):
+                    if parent_id not in chunk:
+                        continue
+                    node = tree[parent_id]
+                    node["items"].append({key: item.get(key) for key in ('id', 'name', 'webViewLink', 'mimeType')})
+                    if is_folder:
+                        node["folders"].setdefault(item['name'], item['id'])  # First match wins, like the old name search
+                if is_folder and item['id'] not in tree:
+                    tree[item['id']] = {"folders": {}, "items": []}
+                    next_level.append(item['id'])
+        level = next_level
+    return tree
+
+async def get_drive_folder_tree(guild_id, max_age=DRIVE_TREE_MAX_AGE_SECONDS):
+    """
+    Serve a guild's template Drive folder tree, refetching it once it is older than max_age seconds.
+
+    Returns:
+        {"root", "folders", "fetched_at"} (see fetch_drive_folder_tree), or None if the folder is unknown
+    """
+    state = await get_current_guild_state(guild_id)
+    root = state.get("parent_folder_id") if state else None
+    if not root:
+        return None
+
+    cached = drive_folder_trees.get(guild_id)
+    if cached and cached["root"] == root and (datetime.now() - cached["fetched_at"]).total_seconds() < max_age:
+        return cached
+
+    folders = await asyncio.to_thread(fetch_drive_folder_tree, root)
+    cached = {"root": root, "folders": folders, "fetched_at": datetime.now()}
+    drive_folder_trees[guild_id] = cached
+    print(f"🌳 Fetched Drive folder tree for guild {guild_id} ({len(folders)} folders)")
+    return cached
+
+async def find_drive_folder_items(guild_id, *path):
+    """
+    Look up a folder below the guild's template folder by its name path (e.g. "Tests", "Anatomy").
+
+    Returns:
+        List of the folder's children (id, name, webViewLink, mimeType), or None if the folder doesn't exist
+    """
+    tree = await get_drive_folder_tree(guild_id)
+    if tree is None:
+        print(f"❌ DEBUG: Could not find the template folder for guild {guild_id}")
+        return None
+
+    folder_id = tree["root"]
+    for depth, name in enumerate(path):
+        folders = tree["folders"][folder_id]["folders"]
+        if name not in folders:
+            print(f"❌ DEBUG: No '{name}' folder found in {'/'.join(path[:depth]) or 'the parent directory'}")
+            print(f"📁 DEBUG: Found folders: {list(folders)}")
+            return None
+        folder_id = folders[name]
+    print(f"✅ DEBUG: Found {'/'.join(path)} folder: {folder_id}")
+    return tree["folders"][folder_id]["items"]
+
+def parse_row_coordinates(row):
+    """
+    Read a building's location from a Runner Assignments row.
+
+    Args:
+        row: Sheet record; "Latitude"/"Longitude" (or lat/lon/lng) win over a "lat, lon" "Coordinates" cell
+
+    Returns:
+        (lat, lon) tuple, or None if the row has no usable location
+    """
+    def _parse_float(val):
+        try:
+            if isinstance(val, str):
+                val = val.strip()
+                if not val:
+                    return None
+            return float(val)
+        except Exception:
+            return None
+
+    # Case-insensitive row access
+    lower_row = { (k.strip().lower() if isinstance(k, str) else k): v for k, v in row.items() }
+    lat = _parse_float(lower_row.get("latitude", lower_row.get("lat")))
+    lon = _parse_float(lower_row.get("longitude", lower_row.get("lon", lower_row.get("lng"))))
+
+    if (lat is None or lon is None) and ("coordinates" in lower_row and lower_row["coordinates"]):
+        coord_str = str(lower_row["coordinates"]).strip()
+        if "," in coord_str:
+            parts = [p.strip() for p in coord_str.split(",")]
+            if len(parts) >= 2:
+                if lat is None:
+                    lat = _parse_float(parts[0])
+                if lon is None:
+                    lon = _parse_float(parts[1])
+
+    if lat is None or lon is None:
+        return None
+    return (lat, lon)
+
+def parse_walking_time_matrix(values):
+    """
+    Parse a building-to-building walking-time table.
+
+    Args:
+        values: Rows of cells; building names across the first row and down the first column,
+            minutes in between (either triangle is enough, both directions are averaged)
+
+    Returns:
+        Dict with "buildings" (lowercased names) and "minutes" (symmetric n x n list)
+    """
+    header = [str(cell).strip().lower() for cell in values[0][1:]] if values else []
+    columns = [(j, name) for j, name in enumerate(header) if name]
+    buildings = [name for _, name in columns]
+    index = {name: i for i, name in enumerate(buildings)}
+    n = len(buildings)
+
+    minutes = [[None] * n for _ in range(n)]
+    for row in values[1:]:
+        i = index.get(str(row[0]).strip().lower()) if row else None
+        if i is None:
+            continue
+        for col, (j, _) in enumerate(columns):
+            cell = str(row[j + 1]).strip() if j + 1 < len(row) else ""
+            if cell:
+                minutes[i][col] = float(cell)
+
+    for i in range(n):
+        minutes[i][i] = 0.0
+        for j in range(i + 1, n):
+            there, back = minutes[i][j], minutes[j][i]
+            if there is None and back is None:
+                raise ValueError(f"No walking time between '{buildings[i]}' and '{buildings[j]}'")
+            both = (there + back) / 2 if there is not None and back is not None else (there if there is not None else back)
+            minutes[i][j] = minutes[j][i] = both
+
+    return {"buildings": buildings, "minutes": minutes}
+
+def load_walking_time_matrix(guild_id, workbooks):
+    """
+    Load a guild's walking-time matrix (blocking): a "Walking Times" tab in one of the
+    given spreadsheets, else the local WALKING_TIMES_CSV file.
+
+    Returns:
+        Parsed matrix (see parse_walking_time_matrix), or None if there isn't one
+    """
+    for workbook in workbooks:
+        try:
+            return parse_walking_time_matrix(workbook.worksheet(WALKING_TIMES_TAB).get_all_values())
+        except gspread.exceptions.WorksheetNotFound:
+            continue
+
+    csv_path = WALKING_TIMES_CSV.format(guild_id=guild_id) if WALKING_TIMES_CSV else None
+    if csv_path and os.path.exists(csv_path):
+        with open(csv_path, newline='') as f:
+            return parse_walking_time_matrix(list(csv.reader(f)))
+    return None
+
+def build_routing_table(state):
+    """
+    Build a guild's ticket routing table from its state snapshot.
+
+    Returns:
+        Dict with "users" (discord_id -> event/building/room/name), "building_zones"
+        (lowercased building -> zone), "zone_runners" (zone -> runner Discord IDs),
+        "all_runners" (every runner Discord ID), "runner_ids" (the same, as a set)
+        and "zone_neighbors" (zone -> other runner zones, shortest walk or nearest centroid first)
+    """
+    # Roster: first row per Discord ID wins, like the old sheet scan
+    users = {}
+    email_to_id = {}
+    for row in state.get("roster", []):
+        try:
+            discord_id = int(str(row.get("Discord ID", "")).strip())
+        except ValueError:
+            continue
+
+        email = str(row.get("Email", "")).strip().lower()
+        if email:
+            email_to_id.setdefault(email, []).append(discord_id)
+
+        if discord_id not in users:
+            event = str(row.get("First Event", "")).strip()
+            building = str(row.get("Building 1", "")).strip()
+            room = str(row.get("Room 1", "")).strip()
+            users[discord_id] = {
+                "event": event if event else None,
+                "building": building if building else None,
+                "room": room if room else None,
+                "name": str(row.get("Name", "")).strip()
+            }
+
+    # Runners: anyone with a Runner Zone, resolved to Discord IDs through their roster email
+    zone_runners = {}
+    all_runners = []
+    for row in state.get("runner_rows", []):
+        runner_zone = row.get("Runner Zone", "")
+        email = str(row.get("Email", "")).strip().lower()
+        if not runner_zone or not email:
+            continue
+
+        discord_ids = email_to_id.get(email, [])
+        all_runners.extend(discord_ids)
+        try:
+            zone_runners.setdefault(int(runner_zone), []).extend(discord_ids)
+        except (ValueError, TypeError):
+            continue
+
+    # A runner listed on several rows is still only pinged once
+    all_runners = list(dict.fromkeys(all_runners))
+    zone_runners = {zone: list(dict.fromkeys(ids)) for zone, ids in zone_runners.items()}
+
+    # Zone centroids from the building locations, for widening a ticket to the nearest zones
+    zone_points = {}
+    for row in state.get("runner_rows", []):
+        coords = parse_row_coordinates(row)
+        try:
+            zone = int(row.get("Zone Number", ""))
+        except (ValueError, TypeError):
+            continue
+        if coords is not None:
+            zone_points.setdefault(zone, []).append(coords)
+
+    centroids = {
+        zone: (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+        for zone, points in zone_points.items()
+    }
+
+    def _zone_distance(a, b):
+        # Equirectangular approximation is plenty at campus scale
+        (lat1, lon1), (lat2, lon2) = centroids[a], centroids[b]
+        x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+        y = math.radians(lat2 - lat1)
+        return math.hypot(x, y)
+
+    # With a walking-time matrix, zones are as close as the mean walk between their buildings
+    walking = state.get("walking_times")
+    zone_walk_members = {}  # zone -> matrix indexes of its buildings
+    if walking:
+        walk_index = {name: i for i, name in enumerate(walking["buildings"])}
+        walk_minutes = np.asarray(walking["minutes"], dtype=float)
+        for building, zone in state.get("building_zones", {}).items():
+            if building in walk_index:
+                zone_walk_members.setdefault(zone, []).append(walk_index[building])
+
+    def _zone_walk(a, b):
+        if a not in zone_walk_members or b not in zone_walk_members:
+            return None
+        return float(walk_minutes[np.ix_(zone_walk_members[a], zone_walk_members[b])].mean())
+
+    # Walking times first, then centroid distance; zones with neither go last, in zone order
+    zone_neighbors = {}
+    for zone in set(zone_runners) | set(centroids) | set(zone_walk_members):
+        others = [z for z in zone_runners if z != zone]
+        walks = {z: _zone_walk(zone, z) for z in others}
+        others.sort(key=lambda z: (
+            walks[z] is None,
+            walks[z] or 0,
+            zone not in centroids or z not in centroids,
+            _zone_distance(zone, z) if zone in centroids and z in centroids else 0,
+            z,
+        ))
+        zone_neighbors[zone] = others
 
-                    return {
-                        "event": event if event else None,
-                        "building": building if building else None,
-                        "room": room if room else None,
-                        "name": str(row.get("Name", "")).strip()
-                    }
-            except ValueError:
-                # Not a numeric Discord ID, skip
-                continue
+    return {
+        "users": users,
+        "building_zones": state.get("building_zones", {}),
+        "zone_runners": zone_runners,
+        "all_runners": all_runners,
+        "runner_ids": set(all_runners),
+        "zone_neighbors": zone_neighbors,
+    }
 
-        print(f"⚠️ User with Discord ID {discord_id} not found in sheet")
+async def get_routing_table(guild_id):
+    """Get a guild's ticket routing table (served from memory, rebuilt when its snapshot changes)"""
+    state = await get_current_guild_state(guild_id)
+    if state is None:
         return None
+    if guild_id not in guild_routing:
+        guild_routing[guild_id] = build_routing_table(state)
+    return guild_routing[guild_id]
 
-    except Exception as e:
-        print(f"❌ Error looking up user event/building: {e}")
+async def get_user_event_building(guild_id, discord_id):
+    """Look up a user's event and building from the routing table"""
+    routing = await get_routing_table(guild_id)
+    if routing is None:
+        print(f"❌ No spreadsheet connected for guild {guild_id}")
         return None
 
+    user_info = routing["users"].get(discord_id)
+    if user_info is None:
+        print(f"⚠️ User with Discord ID {discord_id} not found in sheet")
+    return user_info
+
 
 async def get_building_events(guild_id, building):
-    """Get all events and rooms for a specific building from the main sheet"""
-    if guild_id not in spreadsheets:
+    """Get all events and rooms for a specific building from the roster snapshot"""
+    state = await get_current_guild_state(guild_id)
+    if state is None:
         print(f"❌ No spreadsheet connected for guild {guild_id}")
         return []
 
     try:
-        # Get the main worksheet
-        spreadsheet = spreadsheets[guild_id]
-        sheet = spreadsheet.worksheet(SHEET_PAGE_NAME)
-        data = sheet.get_all_records()
-
         # Find all events in this building
         building_events = []
-        for row in data:
+        for row in state["roster"]:
             row_building = str(row.get("Building 1", "")).strip()
             if row_building.lower() == building.lower():
                 event = str(row.get("First Event", "")).strip()
@@ -2599,163 +3593,25 @@ async def get_building_events(guild_id, building):
 
 
 async def get_building_zone(guild_id, building):
-    """Get the zone number for a building from the Runner Assignments sheet"""
-    if guild_id not in spreadsheets:
+    """Get the zone number for a building from the routing table"""
+    routing = await get_routing_table(guild_id)
+    if routing is None:
         print(f"❌ No spreadsheet connected for guild {guild_id}")
         return None
 
-    try:
-        spreadsheet = spreadsheets[guild_id]
-
-        # Try to get the Runner Assignments worksheet
-        try:
-            sheet = spreadsheet.worksheet("Runner Assignments")
-        except Exception:
-            # If not found as a worksheet, search for a separate spreadsheet
-            try:
-                from googleapiclient.discovery import build
-                drive_service = build('drive', 'v3', credentials=creds)
-
-                # Get parent folder of the currently connected spreadsheet
-                sheet_metadata = drive_service.files().get(fileId=spreadsheet.id, fields='parents').execute()
-                parent_folders = sheet_metadata.get('parents', [])
-                if not parent_folders:
-                    print("❌ Could not determine parent folder for Runner Assignments lookup")
-                    return None
-
-                parent_folder_id = parent_folders[0]
-
-                # Search for Runner Assignments spreadsheet
-                q = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains 'Runner Assignments'"
-                results = drive_service.files().list(q=q, fields='files(id, name)').execute()
-                files = results.get('files', [])
-
-                if not files:
-                    print("❌ Could not find Runner Assignments spreadsheet")
-                    return None
-
-                # Open the first matching spreadsheet
-                runner_spreadsheet = gc.open_by_key(files[0]['id'])
-                sheet = runner_spreadsheet.sheet1  # Use first worksheet
-
-            except Exception as e:
-                print(f"❌ Error finding Runner Assignments spreadsheet: {e}")
-                return None
-
-        # Get all data from the sheet
-        data = sheet.get_all_records()
-
-        # Find the building and get its zone number
-        for row in data:
-            row_building = str(row.get("Building", "")).strip()
-            if row_building.lower() == building.lower():
-                zone = row.get("Zone Number", "")
-                if zone:
-                    try:
-                        return int(zone)
-                    except (ValueError, TypeError):
-                        print(f"⚠️ Invalid zone value '{zone}' for building '{building}'")
-                        return None
-
+    zone = routing["building_zones"].get(building.strip().lower())
+    if zone is None:
         print(f"⚠️ Building '{building}' not found in Runner Assignments")
-        return None
-
-    except Exception as e:
-        print(f"❌ Error looking up building zone: {e}")
-        return None
+    return zone
 
 
 async def get_zone_runners(guild_id, zone):
     """Get all Discord IDs of runners assigned to a specific zone"""
-    if guild_id not in spreadsheets:
+    routing = await get_routing_table(guild_id)
+    if routing is None:
         print(f"❌ No spreadsheet connected for guild {guild_id}")
         return []
-
-    try:
-        spreadsheet = spreadsheets[guild_id]
-
-        # Try to get the Runner Assignments worksheet
-        try:
-            sheet = spreadsheet.worksheet("Runner Assignments")
-        except Exception:
-            # If not found as a worksheet, search for a separate spreadsheet
-            try:
-                from googleapiclient.discovery import build
-                drive_service = build('drive', 'v3', credentials=creds)
-
-                # Get parent folder of the currently connected spreadsheet
-                sheet_metadata = drive_service.files().get(fileId=spreadsheet.id, fields='parents').execute()
-                parent_folders = sheet_metadata.get('parents', [])
-                if not parent_folders:
-                    print("❌ Could not determine parent folder for zone runners lookup")
-                    return []
-
-                parent_folder_id = parent_folders[0]
-
-                # Search for Runner Assignments spreadsheet
-                q = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains 'Runner Assignments'"
-                results = drive_service.files().list(q=q, fields='files(id, name)').execute()
-                files = results.get('files', [])
-
-                if not files:
-                    print("❌ Could not find Runner Assignments spreadsheet")
-                    return []
-
-                # Open the first matching spreadsheet
-                runner_spreadsheet = gc.open_by_key(files[0]['id'])
-                sheet = runner_spreadsheet.sheet1  # Use first worksheet
-
-            except Exception as e:
-                print(f"❌ Error finding Runner Assignments spreadsheet: {e}")
-                return []
-
-        # Get all data from the sheet
-        data = sheet.get_all_records()
-
-        # Find all runners in the specified zone
-        runner_emails = []
-        for row in data:
-            row_zone = row.get("Runner Zone", "")
-            if row_zone:
-                try:
-                    if int(row_zone) == zone:
-                        # This runner is in the target zone
-                        email = str(row.get("Email", "")).strip()
-                        if email:
-                            runner_emails.append(email.lower())
-                except (ValueError, TypeError):
-                    continue
-
-        if not runner_emails:
-            return []
-
-        print(f"🔍 Found {len(runner_emails)} runner emails in zone {zone}")
-
-        # Now cross-reference with the main sheet to get Discord IDs
-        try:
-            main_sheet = spreadsheet.worksheet(SHEET_PAGE_NAME)
-            main_data = main_sheet.get_all_records()
-        except Exception as e:
-            print(f"❌ Error accessing main sheet for Discord ID lookup: {e}")
-            return []
-
-        zone_runners = []
-        for row in main_data:
-            email = str(row.get("Email", "")).strip().lower()
-            if email in runner_emails:
-                discord_id = str(row.get("Discord ID", "")).strip()
-                if discord_id:
-                    try:
-                        zone_runners.append(int(discord_id))
-                        print(f"✅ Found Discord ID {discord_id} for runner email {email}")
-                    except ValueError:
-                        print(f"⚠️ Invalid Discord ID '{discord_id}' for runner email {email}")
-
-        return zone_runners
-
-    except Exception as e:
-        print(f"❌ Error looking up zone runners: {e}")
-        return []
+    return list(routing["zone_runners"].get(zone, []))
 
 
 async def check_for_burger_request(thread):
@@ -2846,6 +3702,313 @@ async def check_for_burger_request(thread):
         traceback.print_exc()
 
 
+def ticket_wait_time(ping_count):
+    """How long to wait after a ticket's latest ping before the next one"""
+    # ping_count = 1 (after 1st ping): wait 3 minutes for 2nd ping
+    # ping_count = 2 (after 2nd ping): wait 1 minute for 3rd ping
+    if ping_count == 1:
+        return timedelta(minutes=3)
+    return timedelta(minutes=1)
+
+def runner_loads():
+    """Count each runner's open tickets: unclaimed ones they've been pinged on plus ones they've claimed"""
+    loads = {}
+    for ticket_info in active_help_tickets.values():
+        owner = ticket_info.get("claimed_by")
+        for runner_id in [owner] if owner else ticket_info.get("assigned_runners", []):
+            loads[runner_id] = loads.get(runner_id, 0) + 1
+    return loads
+
+def get_cached_runner_ids(guild_id):
+    """Get a guild's runner Discord IDs from memory only (no Google or Discord calls)"""
+    routing = guild_routing.get(guild_id)
+    if routing is None:
+        state = get_guild_state(guild_id)
+        if state is None:
+            return set()
+        routing = guild_routing[guild_id] = build_routing_table(state)
+    return routing["runner_ids"]
+
+def claim_ticket(thread_id, runner_id, claim_kind):
+    """
+    Make a runner the owner of a ticket, which stops its re-pings.
+
+    Args:
+        thread_id: The ticket's thread ID
+        runner_id: Discord ID of the claiming runner
+        claim_kind: "message" or "reaction"
+
+    Returns:
+        True if the runner now owns the ticket, False if it's untracked or already claimed
+    """
+    ticket_info = active_help_tickets.get(thread_id)
+    if ticket_info is None or ticket_info.get("claimed_by"):
+        return False
+
+    now = datetime.now()
+    samples = runner_latencies.setdefault(runner_id, deque(maxlen=RUNNER_LATENCY_SAMPLES))
+    samples.append((now - ticket_info["created_at"]).total_seconds())
+
+    ticket_info["has_response"] = True
+    ticket_info["claimed_by"] = runner_id
+    ticket_info["claimed_at"] = now
+    ticket_info["claim_kind"] = claim_kind
+    # The next deadline now releases the claim instead of re-pinging
+    ticket_info["next_due_at"] = now + timedelta(minutes=RUNNER_CLAIM_WINDOW_MINUTES)
+    persist_ticket(thread_id)
+    schedule_ticket(thread_id)
+    return True
+
+async def announce_ticket_claim(thread, runner_id):
+    """Tell the ticket who picked it up (the mention is in the embed, so nobody is pinged)"""
+    embed = discord.Embed(
+        title="Ticket Claimed",
+        description=f"<@{runner_id}> is on it! Other runners won't be pinged again for this ticket.",
+        color=discord.Color.green()
+    )
+    await thread.send(embed=embed)
+
+async def send_ticket_ping(thread, content, embed):
+    """Send a ticket ping and add the one-click claim reaction to it"""
+    ping_message = await thread.send(content=content, embed=embed)
+    try:
+        await ping_message.add_reaction(CLAIM_REACTION)
+    except discord.HTTPException as e:
+        print(f"⚠️ Could not add claim reaction in ticket {thread.id}: {e}")
+    return ping_message
+
+def select_ticket_runners(guild, routing, zone, already_pinged, count=TICKET_RUNNERS_PER_PING):
+    """
+    Pick the runners to add to a ticket's next ping.
+
+    Args:
+        guild: Guild the ticket is in (runners who left it are skipped)
+        routing: The guild's routing table
+        zone: The ticket's zone
+        already_pinged: Discord IDs pinged on earlier rounds
+        count: Runners wanted; 0 takes a whole zone, like before load-aware routing
+
+    Returns:
+        Discord IDs from the ticket's zone first, then the nearest zones, least loaded
+        (then fastest to respond recently) first
+    """
+    loads = runner_loads()
+
+    def _rank(runner_ids):
+        def _key(runner_id):
+            samples = runner_latencies.get(runner_id)
+            # Runners with no history yet aren't penalized, so they get a chance
+            latency = sum(samples) / len(samples) if samples else 0
+            return (loads.get(runner_id, 0), latency, random.random())
+        return sorted(runner_ids, key=_key)
+
+    zones = [zone] + routing["zone_neighbors"].get(zone, [z for z in routing["zone_runners"] if z != zone])
+    selected = []
+    for candidate_zone in zones:
+        candidates = [
+            runner_id for runner_id in routing["zone_runners"].get(candidate_zone, [])
+            if runner_id not in already_pinged and runner_id not in selected and guild.get_member(runner_id)
+        ]
+        if count <= 0:
+            if candidates:
+                return _rank(candidates)
+            continue
+        selected.extend(_rank(candidates)[:count - len(selected)])
+        if len(selected) >= count:
+            break
+    return selected
+
+def serialize_ticket(ticket_info):
+    """Convert a ticket record into JSON-friendly form for the state store"""
+    data = dict(ticket_info)
+    data["opened_at"] = ticket_info["opened_at"].isoformat()
+    data["created_at"] = ticket_info["created_at"].isoformat()
+    data["next_due_at"] = ticket_info["next_due_at"].isoformat()
+    data["ping_times"] = [t.isoformat() for t in ticket_info["ping_times"]]
+    if ticket_info.get("claimed_at"):
+        data["claimed_at"] = ticket_info["claimed_at"].isoformat()
+    return data
+
+def deserialize_ticket(data):
+    """Rebuild a ticket record read from the state store"""
+    ticket_info = dict(data)
+    ticket_info["created_at"] = datetime.fromisoformat(data["created_at"])
+    ticket_info["next_due_at"] = datetime.fromisoformat(data["next_due_at"])
+    # Tickets stored before latency metrics only kept their latest ping time
+    ticket_info["opened_at"] = datetime.fromisoformat(data.get("opened_at", data["created_at"]))
+    ticket_info["ping_times"] = [datetime.fromisoformat(t) for t in data.get("ping_times", [data["created_at"]])]
+    if data.get("claimed_at"):
+        ticket_info["claimed_at"] = datetime.fromisoformat(data["claimed_at"])
+    # Tickets stored before load-aware routing kept their pinged runners under "zone_runners"
+    if "assigned_runners" not in ticket_info:
+        ticket_info["assigned_runners"] = ticket_info.pop("zone_runners", [])
+    return ticket_info
+
+def persist_ticket(thread_id):
+    """Queue a ticket's current record for the next batched write"""
+    ticket_removed_ids.discard(thread_id)
+    ticket_dirty_ids.add(thread_id)
+    schedule_ticket_flush()
+
+def build_ticket_metrics(ticket_info, closed_reason):
+    """
+    Build the timing record kept for a finished ticket.
+
+    Args:
+        ticket_info: The ticket's record
+        closed_reason: Why tracking stopped: "claim_expired", "answered_offline", "unanswered",
+            "archived", "deleted" or "error"
+
+    Returns:
+        JSON-friendly dict for the "ticket_metrics" namespace; claimed tickets count as "answered"
+    """
+    now = datetime.now()
+    claimed_at = ticket_info.get("claimed_at")
+    answered = claimed_at is not None
+    return {
+        "guild_id": ticket_info["guild_id"],
+        "zone": ticket_info["zone"],
+        "building": ticket_info["building"],
+        "event": ticket_info["event"],
+        "opened_at": ticket_info["opened_at"].isoformat(),
+        "ping_times": [t.isoformat() for t in ticket_info["ping_times"]],
+        "ping_count": ticket_info["ping_count"],
+        "outcome": "answered" if answered else closed_reason,
+        "closed_reason": closed_reason,
+        "responded_at": claimed_at.isoformat() if answered else None,
+        "response_seconds": (claimed_at - ticket_info["opened_at"]).total_seconds() if answered else None,
+        "response_kind": ticket_info.get("claim_kind"),
+        "responder_id": ticket_info.get("claimed_by"),
+        "closed_at": now.isoformat(),
+    }
+
+def forget_ticket(thread_id, outcome=None):
+    """Stop tracking a ticket, keep its timing record if it finished with an outcome, and queue its removal"""
+    ticket_info = active_help_tickets.pop(thread_id, None)
+    if ticket_info is not None and outcome:
+        ticket_metrics_pending[thread_id] = build_ticket_metrics(ticket_info, outcome)
+    ticket_dirty_ids.discard(thread_id)
+    ticket_removed_ids.add(thread_id)
+    schedule_ticket_flush()
+    ticket_schedule_wakeup.set()
+
+def schedule_ticket(thread_id):
+    """Queue a ticket's next due time for the re-ping scheduler and wake it up"""
+    heapq.heappush(ticket_schedule, (active_help_tickets[thread_id]["next_due_at"], thread_id))
+    ticket_schedule_wakeup.set()
+
+def schedule_ticket_flush(delay=TICKET_FLUSH_DELAY_SECONDS):
+    """Start a batched ticket flush unless one is already waiting (the flush task itself may queue its follow-up)"""
+    global ticket_flush_task
+    if ticket_flush_task is None or ticket_flush_task.done() or ticket_flush_task is asyncio.current_task():
+        ticket_flush_task = asyncio.create_task(flush_ticket_changes(delay))
+
+async def flush_ticket_changes(delay=TICKET_FLUSH_DELAY_SECONDS):
+    """
+    Write every ticket change (and finished tickets' timing records) made within the flush window.
+
+    Changes made while the write is in flight, and writes that failed, are flushed again
+    afterwards; failures are retried with exponential backoff.
+    """
+    global ticket_flush_failures
+    if delay:
+        await asyncio.sleep(delay)
+
+    upserts = {
+        thread_id: serialize_ticket(active_help_tickets[thread_id])
+        for thread_id in ticket_dirty_ids if thread_id in active_help_tickets
+    }
+    deletes = list(ticket_removed_ids)
+    metrics = dict(ticket_metrics_pending)
+    ticket_dirty_ids.clear()
+    ticket_removed_ids.clear()
+    ticket_metrics_pending.clear()
+
+    next_delay = TICKET_FLUSH_DELAY_SECONDS
+    try:
+        await state_store.apply_changes("tickets", upserts, deletes)
+        await state_store.upsert_many("ticket_metrics", metrics)
+        ticket_flush_failures = 0
+    except Exception as e:
+        ticket_flush_failures += 1
+        next_delay = min(TICKET_FLUSH_DELAY_SECONDS * 2 ** ticket_flush_failures, TICKET_FLUSH_MAX_RETRY_SECONDS)
+        print(f"❌ Error persisting help tickets (attempt {ticket_flush_failures}), retrying in {next_delay}s: {e}")
+        # Keep the changes queued for the retry (changes made since then win over the failed ones)
+        ticket_dirty_ids.update(thread_id for thread_id in upserts if thread_id not in ticket_removed_ids)
+        ticket_removed_ids.update(thread_id for thread_id in deletes if thread_id not in ticket_dirty_ids)
+        for thread_id, record in metrics.items():
+            ticket_metrics_pending.setdefault(thread_id, record)
+
+    # Anything queued while writing (or put back after a failure) gets its own flush
+    if ticket_dirty_ids or ticket_removed_ids or ticket_metrics_pending:
+        schedule_ticket_flush(next_delay)
+
+async def ticket_answered_while_offline(thread, ticket_info):
+    """Check whether a runner answered or reacted to a ticket while the bot was down"""
+    runner_ids = get_cached_runner_ids(thread.guild.id)
+    if not runner_ids:
+        return False
+
+    async for message in thread.history(after=ticket_info["created_at"], limit=50):
+        if not message.author.bot and message.author.id in runner_ids:
+            return True
+        for reaction in message.reactions:
+            if str(reaction.emoji) not in HELPFUL_REACTIONS:
+                continue
+            async for user in reaction.users():
+                if user.id in runner_ids:
+                    return True
+    return False
+
+async def restore_help_tickets():
+    """Rehydrate persisted help tickets and reconcile them with the threads' live state"""
+    stored = await state_store.fetch_all("tickets")
+    if not stored:
+        return
+
+    print(f"🎫 Restoring {len(stored)} persisted help ticket(s)...")
+    restored = 0
+    for thread_id_str, data in stored.items():
+        thread_id = int(thread_id_str)
+        try:
+            ticket_info = deserialize_ticket(data)
+            # Tracked from the start so tickets dropped below still leave a timing record
+            active_help_tickets[thread_id] = ticket_info
+            guild = bot.get_guild(ticket_info["guild_id"])
+            if not guild:
+                print(f"⚠️ Guild for ticket {thread_id} is gone, dropping it")
+                forget_ticket(thread_id)
+                continue
+
+            thread = guild.get_thread(thread_id)
+            if not thread:
+                try:
+                    thread = await guild.fetch_channel(thread_id)
+                except discord.NotFound:
+                    print(f"🗑️ Ticket {thread_id} was deleted while offline, dropping it")
+                    forget_ticket(thread_id, outcome="deleted")
+                    continue
+
+            if thread.archived or thread.locked:
+                print(f"🗄️ Ticket {thread_id} was archived/locked while offline, dropping it")
+                forget_ticket(thread_id, outcome="archived")
+                continue
+
+            if not ticket_info.get("claimed_by") and await ticket_answered_while_offline(thread, ticket_info):
+                print(f"✅ Ticket {thread_id} was answered by a runner while offline, dropping it")
+                forget_ticket(thread_id, outcome="answered_offline")
+                continue
+
+            schedule_ticket(thread_id)
+            restored += 1
+
+        except Exception as e:
+            print(f"❌ Error restoring ticket {thread_id}: {e}")
+            # Left in the store so the next restart tries again
+            active_help_tickets.pop(thread_id, None)
+
+    print(f"🎫 Resumed tracking {restored} help ticket(s)")
+
 @bot.event
 async def on_thread_create(thread):
     """Handle new help tickets - ping runners in the user's zone"""
@@ -2894,11 +4057,12 @@ async def on_thread_create(thread):
 
             print(f"🗺️ Building '{building}' is in zone {zone}")
 
-            # Get all runners in this zone
-            zone_runners = await get_zone_runners(guild_id, zone)
+            # Pick the least-loaded runners in this zone, widening to the nearest zones if it's short
+            routing = await get_routing_table(guild_id)
+            zone_runners = select_ticket_runners(thread.guild, routing, zone, set())
             is_fallback_to_all = False
             if not zone_runners:
-                print(f"⚠️ No runners found for zone {zone}, falling back to ALL runners")
+                print(f"⚠️ No runners found for zone {zone} or nearby zones, falling back to ALL runners")
                 # Fall back to getting all runners if no zone runners found
                 zone_runners = await get_all_runners(guild_id)
                 is_fallback_to_all = True
@@ -2907,7 +4071,7 @@ async def on_thread_create(thread):
                     return
                 print(f"🚨 Pinging ALL {len(zone_runners)} runners (no zone assignments)")
             else:
-                print(f"👥 Found {len(zone_runners)} runners in zone {zone}")
+                print(f"👥 Picked {len(zone_runners)} least-loaded runner(s) for zone {zone}")
 
             # Ping the runners in the ticket
             runner_mentions = []
@@ -2943,18 +4107,24 @@ async def on_thread_create(thread):
                         value=f"Please respond here if you can assist with this ticket!",
                         inline=False
                     )
+                embed.set_footer(text=f"React with {CLAIM_REACTION} or reply to claim this ticket")
 
                 # Send mentions as regular message content (not in embed) so Discord actually notifies users
-                await thread.send(content=mention_text, embed=embed)
+                await send_ticket_ping(thread, mention_text, embed)
                 if is_fallback_to_all:
                     print(f"✅ Pinged {len(runner_mentions)} runners (ALL runners - no zone assignments) in ticket")
                 else:
                     print(f"✅ Pinged {len(runner_mentions)} zone runners in ticket")
 
                 # Track this ticket for re-pinging
+                pinged_at = datetime.now()
                 active_help_tickets[thread.id] = {
-                    "created_at": datetime.now(),
-                    "zone_runners": zone_runners,  # List of Discord IDs
+                    "guild_id": guild_id,
+                    "opened_at": pinged_at,
+                    "ping_times": [pinged_at],
+                    "created_at": pinged_at,
+                    "next_due_at": pinged_at + ticket_wait_time(1),
+                    "assigned_runners": zone_runners,  # Discord IDs pinged so far
                     "has_response": False,
                     "ping_count": 1,  # First ping already sent
                     "zone": zone,
@@ -2963,6 +4133,8 @@ async def on_thread_create(thread):
                     "event": event,
                     "room": room
                 }
+                persist_ticket(thread.id)
+                schedule_ticket(thread.id)
                 print(f"🎯 Added ticket {thread.id} to tracking system")
 
             else:
@@ -2979,72 +4151,65 @@ async def on_thread_create(thread):
 
 @bot.event
 async def on_message(message):
-    """Detect when runners respond to help tickets"""
+    """Let the first runner who replies in a help ticket claim it"""
     try:
         # Skip bot messages
-        if message.author.bot:
+        if message.author.bot or not message.guild:
             return
 
-        # Check if this is in a tracked help ticket thread
-        if message.channel.id in active_help_tickets:
-            ticket_info = active_help_tickets[message.channel.id]
-
-            # Check if the message author is ANY runner (not just zone runners)
-            is_runner = False
-            guild_id = message.guild.id if message.guild else None
-            if guild_id:
-                all_runner_ids = await get_all_runners(guild_id)
-                if message.author.id in all_runner_ids:
-                    is_runner = True
-
-            if is_runner:
-                # Mark ticket as responded
-                ticket_info["has_response"] = True
-                print(f"✅ Runner {message.author} responded to ticket {message.channel.id}")
+        # Only unclaimed tracked tickets; runner lookup stays in memory
+        ticket_info = active_help_tickets.get(message.channel.id)
+        if ticket_info is None or ticket_info.get("claimed_by"):
+            return
+        if message.author.id not in get_cached_runner_ids(message.guild.id):
+            return
 
-                # Remove from tracking since someone responded
-                del active_help_tickets[message.channel.id]
-                print(f"🗑️ Removed ticket {message.channel.id} from tracking (runner responded)")
+        if claim_ticket(message.channel.id, message.author.id, "message"):
+            print(f"✋ Runner {message.author} claimed ticket {message.channel.id} by replying")
+            await announce_ticket_claim(message.channel, message.author.id)
 
     except Exception as e:
         print(f"❌ Error handling message for ticket tracking: {e}")
 
 
 @bot.event
-async def on_reaction_add(reaction, user):
-    """Detect when runners react to help tickets"""
+async def on_raw_reaction_add(payload):
+    """Let the first runner who reacts to a help ticket (with a helpful reaction) claim it"""
     try:
-        # Skip bot reactions
-        if user.bot:
+        # Raw events also fire for reactions on messages that aren't cached, e.g. pings sent before a restart
+        if payload.guild_id is None or payload.user_id == bot.user.id:
+            return
+        if payload.member is not None and payload.member.bot:
             return
 
-        # Check if this is in a tracked help ticket thread
-        if reaction.message.channel.id in active_help_tickets:
-            ticket_info = active_help_tickets[reaction.message.channel.id]
-
-            # Check if the user is ANY runner (not just zone runners)
-            is_runner = False
-            guild_id = reaction.message.guild.id if reaction.message.guild else None
-            if guild_id:
-                all_runner_ids = await get_all_runners(guild_id)
-                if user.id in all_runner_ids:
-                    is_runner = True
+        ticket_info = active_help_tickets.get(payload.channel_id)
+        if ticket_info is None or ticket_info.get("claimed_by"):
+            return
+        if str(payload.emoji) not in HELPFUL_REACTIONS:
+            return
+        if payload.user_id not in get_cached_runner_ids(payload.guild_id):
+            return
 
-            if is_runner:
-                # Only count specific helpful reactions
-                helpful_reactions = ['👍', '✅', '🆗', '👌', '✋', '🙋', '🙋‍♂️', '🙋‍♀️']
+        if claim_ticket(payload.channel_id, payload.user_id, "reaction"):
+            print(f"✋ Runner {payload.user_id} claimed ticket {payload.channel_id} with {payload.emoji}")
+            guild = bot.get_guild(payload.guild_id)
+            thread = guild.get_thread(payload.channel_id) if guild else None
+            if thread:
+                await announce_ticket_claim(thread, payload.user_id)
 
-                if str(reaction.emoji) in helpful_reactions:
-                    # Mark ticket as responded
-                    ticket_info["has_response"] = True
-                    print(f"✅ Runner {user} reacted to ticket {reaction.message.channel.id} with {reaction.emoji}")
+    except Exception as e:
+        print(f"❌ Error handling reaction for ticket tracking: {e}")
 
-                    # Remove from tracking since someone responded
-                    del active_help_tickets[reaction.message.channel.id]
-                    print(f"🗑️ Removed ticket {reaction.message.channel.id} from tracking (runner reacted)")
 
+@bot.event
+async def on_thread_update(before, after):
+    """Stop tracking help tickets whose threads get archived or locked"""
+    try:
+        if after.id in active_help_tickets and (after.archived or after.locked):
+            forget_ticket(after.id, outcome="archived")
+            print(f"🗄️ Removed archived/locked ticket {after.id} from tracking")
     except Exception as e:
-        print(f"❌ Error handling reaction for ticket tracking: {e}")
+        print(f"❌ Error handling thread update for ticket tracking: {e}")
 
 
 @bot.event
@@ -3052,7 +4217,7 @@ async def on_thread_delete(thread):
     """Clean up tracking when help ticket threads are deleted"""
     try:
         if thread.id in active_help_tickets:
-            del active_help_tickets[thread.id]
+            forget_ticket(thread.id, outcome="deleted")
             print(f"🗑️ Removed deleted ticket {thread.id} from tracking")
     except Exception as e:
         print(f"❌ Error handling thread deletion for ticket tracking: {e}")
@@ -3062,6 +4227,9 @@ async def perform_member_sync(guild, data):
     """Core member sync logic that can be used by both /sync command and /enterfolder"""
     global chapter_role_names
 
+    # Every sync reads the full sheet, so keep the roster snapshot current for free
+    await update_guild_roster(guild.id, data)
+
     # Build set of already-joined member IDs
     joined = {m.id for m in guild.members}
 
@@ -3288,11 +4456,11 @@ async def enter_folder_command(interaction: discord.Interaction, folder_link: st
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
         if "drive.google.com/drive/folders/" in folder_link:
             try:
                 # Extract folder ID from URL like: https://drive.google.com/drive/folders/1drRK7pSdCpbqzJfaDhFtKlYUrf_uYsN8?usp=sharing
@@ -3340,47 +4508,23 @@ async def enter_folder_command(interaction: discord.Interaction, folder_link: st
                 print(f"🔍 DEBUG: Folder ID: {folder_id}")
                 print(f"🔍 DEBUG: Service account email: {SERVICE_EMAIL}")
 
-                # Create a Drive API service using the same credentials
-                from googleapiclient.discovery import build
-                from oauth2client.service_account import ServiceAccountCredentials
-
-                # Build Drive API service
-                print("🔍 DEBUG: Building Drive API service...")
-                drive_service = build('drive', 'v3', credentials=creds)
-                print("✅ DEBUG: Drive API service built successfully")
-
                 # Search for Google Sheets files in the specific folder
                 # Query: files in the folder that are Google Sheets and contain the name
-                query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains '{main_sheet_name}'"
+                query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains '{main_sheet_name}' and trashed=false"
                 print(f"🔍 DEBUG: Search query: {query}")
 
+                # Check files as their pages arrive and stop at the first match
                 print("🔍 DEBUG: Executing Drive API search...")
-                results = drive_service.files().list(
-                    q=query,
-                    fields='files(id, name)',
-                    pageSize=10
-                ).execute()
-                print("✅ DEBUG: Drive API search completed")
-
-                files = results.get('files', [])
-                print(f"🔍 Found {len(files)} potential sheets in folder")
-
-                # Debug: Show all files found
-                if files:
-                    print("📋 DEBUG: Files found in folder:")
-                    for file in files:
-                        print(f"  • {file['name']} (ID: {file['id']})")
-                else:
-                    print("📋 DEBUG: No files found in folder")
-
-                # Look for exact match
                 target_sheet_id = None
-                for file in files:
-                    print(f"🔍 DEBUG: Checking file: {file['name']}")
+                checked = 0
+                async for file in aiter_drive_files(query, 'id, name'):
+                    checked += 1
+                    print(f"🔍 DEBUG: Checking file: {file['name']} (ID: {file['id']})")
                     if main_sheet_name in file['name']:
                         target_sheet_id = file['id']
                         print(f"✅ Found target sheet: {file['name']} (ID: {target_sheet_id})")
                         break
+                print(f"✅ DEBUG: Drive API search completed ({checked} potential sheet(s) checked)")
 
                 if target_sheet_id:
                     # Try to open the sheet using its ID
@@ -3450,8 +4594,9 @@ async def enter_folder_command(interaction: discord.Interaction, folder_link: st
                 print(f"🔍 DEBUG: Attempting to access worksheet data...")
                 guild_id = interaction.guild.id
 
-                # Store per-guild
+                # Store per-guild (a different sheet invalidates the old snapshot and runner worksheet)
                 spreadsheets[guild_id] = found_sheet
+                runner_worksheets.pop(guild_id, None)
                 print(f"✅ DEBUG: Set spreadsheet for guild {guild_id} to: {found_sheet.title}")
 
                 # Try to get the worksheet by the specified name, fall back to first worksheet
@@ -3587,7 +4732,7 @@ async def enter_folder_command(interaction: discord.Interaction, folder_link: st
                 embed.set_footer(text="Use /sync to manually trigger another sync anytime")
 
                 # Save connection details to cache (per-guild)
-                save_guild_spreadsheet_to_cache(
+                await save_guild_spreadsheet_to_cache(
                     guild_id,
                     spreadsheets[guild_id].id,
                     sheets[guild_id].title
@@ -3641,11 +4786,11 @@ async def sync_command(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
     
@@ -3766,109 +4911,475 @@ async def sheet_info_command(interaction: discord.Interaction):
                 )
                 embed.add_field(name="💡 Suggestion", value="Try using `/enterfolder` to reconnect to the sheet", inline=False)
 
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    except Exception as e:
+        # Catch any errors including defer failures
+        print(f"❌ Error in sheetinfo command: {e}")
+        try:
+            if not interaction.response.is_done():
+                await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+            else:
+                await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+        except Exception as followup_error:
+            print(f"❌ Could not send error message: {followup_error}")
+
+def _batched_sq_distances(X, centroids):
+	"""Squared distances from every point to every centroid of every restart.
+
+	Args:
+		X: (n, 2) array of points.
+		centroids: (n_init, k, 2) array.
+
+	Returns:
+		(n_init, n, k) array.
+	"""
+	# |x|² - 2x·c + |c|², without materializing an (n_init, n, k, 2) difference array
+	dist_sq = (X ** 2).sum(axis=1)[None, :, None] - 2 * (X @ centroids.transpose(0, 2, 1)) + (centroids ** 2).sum(axis=2)[:, None, :]
+	return np.maximum(dist_sq, 0)
+
+def _kmeans_plusplus_init(X, k, n_init, rng, w):
+	"""Pick k-means++ starting centroids for several restarts at once.
+
+	Each next centroid is sampled with probability proportional to its weight
+	times its squared distance from the nearest centroid picked so far (D² weighting).
+
+	Args:
+		X: (n, 2) array of points.
+		k: Number of clusters.
+		n_init: Number of independent restarts.
+		rng: numpy Generator.
+		w: (n,) array of point weights.
+
+	Returns:
+		centroids: (n_init, k, 2) array.
+	"""
+	n = X.shape[0]
+	centroids = np.empty((n_init, k, X.shape[1]))
+	centroids[:, 0] = X[rng.choice(n, size=n_init, p=w / w.sum())]
+	closest_sq = ((X[None, :, :] - centroids[:, 0, None, :]) ** 2).sum(axis=2)  # (n_init, n)
+
+	for j in range(1, k):
+		weighted = closest_sq * w
+		totals = weighted.sum(axis=1)
+		# All remaining points coincide with a centroid: fall back to uniform sampling
+		weights = np.where(totals[:, None] > 0, weighted, 1.0)
+		cumulative = np.cumsum(weights, axis=1)
+		targets = rng.random(n_init) * cumulative[:, -1]
+		picks = np.minimum((cumulative < targets[:, None]).sum(axis=1), n - 1)
+		centroids[:, j] = X[picks]
+		closest_sq = np.minimum(closest_sq, ((X[None, :, :] - centroids[:, j, None, :]) ** 2).sum(axis=2))
+
+	return centroids
+
+def _run_kmeans_clustering(points, k, max_iterations=100, n_init=10, seed=42, weights=None):
+	"""Run (weighted) K-means clustering on 2D points.
+
+	Vectorized with NumPy: k-means++ seeding, and all n_init restarts iterate
+	together on one batched distance array; the restart with the lowest
+	inertia wins.
+
+	Args:
+		points: List of (lat, lon) floats.
+		k: Number of clusters.
+		max_iterations: Max iterations to converge.
+		n_init: Number of k-means++ restarts.
+		seed: Random seed, so the same sheet gives the same zones.
+		weights: Optional list of positive floats, one per point; a point of weight 3 acts like 3 copies.
+
+	Returns:
+		labels: List[int] cluster index per point (0..k-1)
+	"""
+	if not points:
+		return []
+	if k <= 0:
+		# Degenerate: one cluster for all points
+		return [0] * len(points)
+	if k >= len(points):
+		return list(range(len(points)))
+
+	X = np.asarray(points, dtype=float)
+	# Center the points: distances are tiny next to raw lat/lon, and the batched expansion would lose them to rounding
+	X = X - X.mean(axis=0)
+	w = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+	rng = np.random.default_rng(seed)
+	centroids = _kmeans_plusplus_init(X, k, n_init, rng, w)
+
+	labels = None
+	for iteration in range(max_iterations):
+		# Squared distances for every restart at once
+		dist_sq = _batched_sq_distances(X, centroids)
+		new_labels = dist_sq.argmin(axis=2)
+		if labels is not None and np.array_equal(new_labels, labels):
+			break
+		labels = new_labels
+
+		# Update centroids (weighted means): one bincount over (restart, cluster) slots per coordinate
+		slots = (labels + np.arange(n_init)[:, None] * k).ravel()
+		counts = np.bincount(slots, weights=np.tile(w, n_init), minlength=n_init * k).reshape(n_init, k)
+		sums = np.stack([
+			np.bincount(slots, weights=np.tile(w * X[:, d], n_init), minlength=n_init * k).reshape(n_init, k)
+			for d in range(X.shape[1])
+		], axis=2)
+		centroids = np.divide(sums, counts[:, :, None], out=centroids.copy(), where=counts[:, :, None] > 0)
+
+		# Handle empty clusters by moving them onto the point farthest from its centroid
+		for r, j in zip(*np.nonzero(counts == 0)):
+			point_dist = dist_sq[r, np.arange(X.shape[0]), labels[r]]
+			far = point_dist.argmax()
+			centroids[r, j] = X[far]
+			labels[r, far] = j
+
+	dist_sq = _batched_sq_distances(X, centroids)
+	labels = dist_sq.argmin(axis=2)
+	inertia = (dist_sq.min(axis=2) * w).sum(axis=1)
+	best = labels[inertia.argmin()]
+
+	# Debug: print cluster distribution
+	cluster_counts = np.bincount(best, minlength=k).tolist()
+	print(f"DEBUG: K-means result for k={k}: cluster sizes = {cluster_counts} (best inertia of {n_init} restarts)")
+
+	return best.tolist()
+
+def _project_to_local_metres(points):
+	"""Project (lat, lon) points onto a local flat plane in metres.
+
+	Equirectangular projection around the points' mean latitude, so a degree of
+	longitude is shortened by cos(latitude) and distances stay true at campus scale.
+
+	Args:
+		points: List of (lat, lon) floats.
+
+	Returns:
+		List of (x, y) metre pairs, in the same order.
+	"""
+	if not points:
+		return []
+	P = np.radians(np.asarray(points, dtype=float))
+	x = EARTH_RADIUS_METRES * P[:, 1] * np.cos(P[:, 0].mean())
+	y = EARTH_RADIUS_METRES * P[:, 0]
+	return np.column_stack([x, y]).tolist()
+
+def _min_cost_capacitated_assignment(cost, sizes, capacity):
+	"""Assign items to clusters at minimum total cost without exceeding any cluster's capacity.
+
+	Solved as a min-cost flow (transportation problem) by successive shortest
+	paths: each step routes supply from an unassigned item into the cheapest
+	cluster with room, possibly shifting already-assigned items between clusters
+	along the way (Bellman-Ford over the k clusters). With unit sizes no item is
+	split and the result is exact. With weighted sizes an item's flow can end up
+	split across clusters (at most k - 1 items in a vertex solution, possibly more
+	with cost ties); each split item goes to the cluster holding most of it, so a
+	cluster can exceed its capacity by up to the combined size of the split items
+	rounded into it, not just one item.
+
+	Args:
+		cost: (n, k) array, cost of putting item i in cluster j.
+		sizes: (n,) array of positive item sizes.
+		capacity: (k,) array of cluster capacities (must add up to at least sizes.sum()).
+
+	Returns:
+		labels: (n,) int array of cluster indices.
+	"""
+	n, k = cost.shape
+	eps = 1e-9
+	flow = np.zeros((n, k))
+	remaining = np.asarray(sizes, dtype=float).copy()
+	spare = np.asarray(capacity, dtype=float).copy()
+	zones = np.arange(k)
+
+	while (remaining > eps).any():
+		# Super source: reach any cluster directly through any item that still has supply
+		start_cost = np.where((remaining > eps)[:, None], cost, np.inf)
+		dist = start_cost.min(axis=0)
+		prev_zone = np.full(k, -1)
+		prev_item = start_cost.argmin(axis=0)
+
+		# Shifting item p's flow from cluster a to cluster b costs cost[p, b] - cost[p, a]
+		shift = np.where((flow > eps)[:, :, None], cost[:, None, :] - cost[:, :, None], np.inf)  # (n, a, b)
+		edge_cost = shift.min(axis=0)
+		edge_item = shift.argmin(axis=0)
+
+		# Bellman-Ford over the clusters
+		for _ in range(k - 1):
+			candidate = dist[:, None] + edge_cost
+			best_from = candidate.argmin(axis=0)
+			best = candidate[best_from, zones]
+			improved = best < dist - eps
+			if not improved.any():
+				break
+			dist = np.where(improved, best, dist)
+			prev_zone = np.where(improved, best_from, prev_zone)
+			prev_item = np.where(improved, edge_item[best_from, zones], prev_item)
+
+		open_zones = spare > eps
+		if not open_zones.any():
+			raise ValueError("Zone capacities are too small for the total size")
+		end = int(np.where(open_zones, dist, np.inf).argmin())
+
+		# Walk the path back to the source and find how much it can carry
+		path = []
+		zone = end
+		amount = spare[end]
+		for _ in range(k):
+			if prev_zone[zone] == -1:
+				break
+			from_zone, item = int(prev_zone[zone]), int(prev_item[zone])
+			path.append((item, from_zone, zone))
+			amount = min(amount, flow[item, from_zone])
+			zone = from_zone
+		source_item = int(prev_item[zone])
+		amount = min(amount, remaining[source_item])
+
+		flow[source_item, zone] += amount
+		remaining[source_item] -= amount
+		for item, from_zone, to_zone in path:
+			flow[item, from_zone] -= amount
+			flow[item, to_zone] += amount
+		spare[end] -= amount
+
+	return flow.argmax(axis=1)
+
+def _zone_capacity(sizes, k, tolerance):
+	"""Capacity of each of k balanced clusters.
+
+	Args:
+		sizes: (n,) array of what each point counts toward its cluster.
+		k: Number of clusters.
+		tolerance: Allowed overshoot of an even share, as a fraction.
+
+	Returns:
+		Capacity (float) shared by every cluster.
+	"""
+	share = sizes.sum() / k
+	limit = share * (1 + tolerance)
+	if np.array_equal(sizes, np.round(sizes)):
+		# Whole-number sizes (e.g. building counts) get a whole-number bound, so no point is split
+		limit = max(np.floor(limit), np.ceil(share))
+	# A single oversized point still has to fit somewhere
+	return max(limit, sizes.max())
+
+def _run_balanced_kmeans_clustering(points, k, weights=None, sizes=None, tolerance=0.15, max_iterations=50, seed=42):
+	"""Run K-means with a capacity bound on every cluster.
+
+	Starts from the unconstrained (weighted) K-means result, then alternates a
+	min-cost capacitated assignment step with weighted centroid updates until
+	the labels stop changing.
+
+	Args:
+		points: List of (x, y) floats (project lat/lon first).
+		k: Number of clusters.
+		weights: Optional list of point weights for the centroid means.
+		sizes: Optional list of what each point counts toward its cluster's capacity (default 1 each).
+		tolerance: A cluster may hold up to (1 + tolerance) times an even share of the total size.
+		max_iterations: Max assignment/update rounds.
+		seed: Random seed for the starting K-means.
+
+	Returns:
+		labels: List[int] cluster index per point (0..k-1)
+	"""
+	if not points:
+		return []
+	if k <= 0:
+		return [0] * len(points)
+	if k >= len(points):
+		return list(range(len(points)))
+
+	X = np.asarray(points, dtype=float)
+	w = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+	s = np.ones(len(points)) if sizes is None else np.asarray(sizes, dtype=float)
+	capacity = np.full(k, _zone_capacity(s, k, tolerance))
+
+	labels = np.asarray(_run_kmeans_clustering(points, k, weights=weights, seed=seed))
+	centroids = np.zeros((k, X.shape[1]))
+	for iteration in range(max_iterations):
+		# Weighted centroids; a cluster left empty keeps its previous centroid
+		counts = np.bincount(labels, weights=w, minlength=k)
+		sums = np.stack([np.bincount(labels, weights=w * X[:, d], minlength=k) for d in range(X.shape[1])], axis=1)
+		centroids = np.divide(sums, counts[:, None], out=centroids, where=counts[:, None] > 0)
+
+		cost = ((X[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+		new_labels = _min_cost_capacitated_assignment(cost, s, capacity)
+		if np.array_equal(new_labels, labels):
+			break
+		labels = new_labels
+
+	# Debug: print cluster distribution
+	cluster_sizes = np.bincount(labels, weights=s, minlength=k).round(2).tolist()
+	print(f"DEBUG: Balanced K-means result for k={k}: cluster sizes = {cluster_sizes} (capacity {capacity[0]:.2f})")
+
+	return labels.tolist()
+
+def _pam_build(D, w, k):
+	"""Greedy PAM BUILD: start from the most central point, then keep adding the point that cuts the most cost.
+
+	Args:
+		D: (n, n) distance matrix.
+		w: (n,) array of point weights.
+		k: Number of medoids.
+
+	Returns:
+		medoids: List[int] point indexes.
+	"""
+	medoids = [int((w[:, None] * D).sum(axis=0).argmin())]
+	closest = D[:, medoids[0]].copy()
+	for _ in range(1, k):
+		gain = (w[:, None] * np.maximum(closest[:, None] - D, 0)).sum(axis=0)
+		gain[medoids] = -1
+		medoids.append(int(gain.argmax()))
+		closest = np.minimum(closest, D[:, medoids[-1]])
+	return medoids
+
+def _pam_swap(D, w, medoids, max_iterations=100):
+	"""PAM SWAP: repeatedly make the single medoid/non-medoid swap that lowers the cost most.
 
-    except Exception as e:
-        # Catch any errors including defer failures
-        print(f"❌ Error in sheetinfo command: {e}")
-        try:
-            if not interaction.response.is_done():
-                await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
-            else:
-                await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
-        except Exception as followup_error:
-            print(f"❌ Could not send error message: {followup_error}")
+	Every (candidate, medoid) swap is scored at once from each point's nearest and
+	second-nearest medoid distances, so an iteration is a few matrix operations.
+
+	Args:
+		D: (n, n) distance matrix.
+		w: (n,) array of point weights.
+		medoids: Starting medoid indexes.
+		max_iterations: Max swaps.
+
+	Returns:
+		medoids: List[int] point indexes.
+	"""
+	n = D.shape[0]
+	k = len(medoids)
+	medoids = list(medoids)
+	rows = np.arange(n)
+	for _ in range(max_iterations):
+		to_medoids = D[:, medoids]
+		order = np.argsort(to_medoids, axis=1)
+		nearest = order[:, 0]
+		d1 = to_medoids[rows, nearest]
+		d2 = to_medoids[rows, order[:, 1]] if k > 1 else np.full(n, np.inf)
+
+		# Cost change of swapping medoid m for candidate x: points keep their nearest medoid
+		# unless x is closer, and points of m fall back to x or their second-nearest medoid
+		keep = w[:, None] * np.minimum(D - d1[:, None], 0)  # (point, candidate)
+		lose = w[:, None] * (np.minimum(D, d2[:, None]) - d1[:, None]) - keep
+		one_hot = (nearest[:, None] == np.arange(k)[None, :]).astype(float)
+		delta = keep.sum(axis=0)[:, None] + lose.T @ one_hot  # (candidate, medoid)
+		delta[medoids, :] = np.inf
+
+		x, m = np.unravel_index(delta.argmin(), delta.shape)
+		if delta[x, m] >= -1e-9:
+			break
+		medoids[m] = int(x)
+	return medoids
+
+def _run_kmedoids_clustering(D, k, weights=None, sizes=None, tolerance=None, seed=42):
+	"""Run k-medoids clustering on a precomputed distance matrix (e.g. walking times).
 
-def _run_kmeans_clustering(points, k, max_iterations=100):
-	"""Run a simple K-means clustering on 2D points.
+	PAM (BUILD + SWAP) for up to KMEDOIDS_CLARA_THRESHOLD points; beyond that CLARA runs
+	PAM on random samples and keeps the medoids that do best on the full matrix. With a
+	tolerance, clusters are capacity-bounded like _run_balanced_kmeans_clustering.
 
 	Args:
-		points: List of (lat, lon) floats.
+		D: (n, n) symmetric distance matrix.
 		k: Number of clusters.
-		max_iterations: Max iterations to converge.
+		weights: Optional list of point weights.
+		sizes: Optional list of what each point counts toward its cluster's capacity (default 1 each).
+		tolerance: If set, a cluster may hold up to (1 + tolerance) times an even share of the total size.
+		seed: Random seed for CLARA sampling.
 
 	Returns:
 		labels: List[int] cluster index per point (0..k-1)
 	"""
-	if not points:
+	D = np.asarray(D, dtype=float)
+	n = D.shape[0]
+	if n == 0:
 		return []
 	if k <= 0:
-		# Degenerate: one cluster for all points
-		return [0] * len(points)
-	if k >= len(points):
-		return list(range(len(points)))
-
-	# For closely spaced points, use a more robust initialization
-	import random
-	random.seed(42)  # For reproducible results
-
-	# Use k-means++ style initialization for better results
-	centroids = [list(random.choice(points))]  # Start with random point
-
-	for _ in range(k - 1):
-		# Find the point that's farthest from existing centroids
-		max_dist = 0
-		farthest_point = None
-		for point in points:
-			min_dist_to_centroids = min(
-				(point[0] - c[0])**2 + (point[1] - c[1])**2
-				for c in centroids
-			)
-			if min_dist_to_centroids > max_dist:
-				max_dist = min_dist_to_centroids
-				farthest_point = point
-
-		if farthest_point:
-			centroids.append(list(farthest_point))
-		else:
-			# Fallback: add a random point
-			centroids.append(list(random.choice(points)))
-
-	def distance_sq(a, b):
-		return (a[0] - b[0]) * (a[0] - b[0]) + (a[1] - b[1]) * (a[1] - b[1])
-
-	labels = [0] * len(points)
-	for iteration in range(max_iterations):
-		changed = False
-		for i, p in enumerate(points):
-			best_idx = 0
-			best_dist = distance_sq(p, centroids[0])
-			for j in range(1, k):
-				d = distance_sq(p, centroids[j])
-				if d < best_dist:
-					best_dist = d
-					best_idx = j
-			if labels[i] != best_idx:
-				labels[i] = best_idx
-				changed = True
-
-		# Update centroids
-		sums = [[0.0, 0.0, 0] for _ in range(k)]
-		for idx, p in enumerate(points):
-			c = labels[idx]
-			sums[c][0] += p[0]
-			sums[c][1] += p[1]
-			sums[c][2] += 1
-
-		# Handle empty clusters by reassigning to a random point
-		for j in range(k):
-			if sums[j][2] > 0:
-				centroids[j][0] = sums[j][0] / sums[j][2]
-				centroids[j][1] = sums[j][1] / sums[j][2]
-			else:
-				# Empty cluster: assign to a random point
-				centroids[j] = list(random.choice(points))
-
-		if not changed:
-			break
+		return [0] * n
+	if k >= n:
+		return list(range(n))
+
+	w = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+
+	def _cost(medoids):
+		return float((w * D[:, medoids].min(axis=1)).sum())
+
+	if n <= KMEDOIDS_CLARA_THRESHOLD:
+		medoids = _pam_swap(D, w, _pam_build(D, w, k))
+	else:
+		rng = np.random.default_rng(seed)
+		sample_size = min(n, 40 + 2 * k)
+		medoids = None
+		for _ in range(KMEDOIDS_CLARA_SAMPLES):
+			# Each sample carries the best medoids so far, so CLARA never gets worse
+			pool = np.setdiff1d(np.arange(n), medoids) if medoids is not None else np.arange(n)
+			extra = rng.choice(pool, size=sample_size - (k if medoids is not None else 0), replace=False)
+			sample = np.concatenate([medoids, extra]) if medoids is not None else extra
+			sub = np.ix_(sample, sample)
+			candidate = [int(sample[i]) for i in _pam_swap(D[sub], w[sample], _pam_build(D[sub], w[sample], k))]
+			if medoids is None or _cost(candidate) < _cost(medoids):
+				medoids = np.asarray(candidate)
+		medoids = [int(m) for m in medoids]
+
+	labels = D[:, medoids].argmin(axis=1)
+
+	if tolerance is not None:
+		s = np.ones(n) if sizes is None else np.asarray(sizes, dtype=float)
+		capacity = np.full(k, _zone_capacity(s, k, tolerance))
+		for _ in range(50):
+			labels = _min_cost_capacitated_assignment(D[:, medoids], s, capacity)
+			# Re-centre each cluster on the member with the lowest weighted distance to the others
+			new_medoids = list(medoids)
+			for j in range(k):
+				members = np.nonzero(labels == j)[0]
+				if len(members):
+					new_medoids[j] = int(members[(w[members, None] * D[np.ix_(members, members)]).sum(axis=0).argmin()])
+			if new_medoids == medoids:
+				break
+			medoids = new_medoids
 
 	# Debug: print cluster distribution
-	cluster_counts = [0] * k
-	for label in labels:
-		cluster_counts[label] += 1
-	print(f"DEBUG: K-means result for k={k}: cluster sizes = {cluster_counts}")
+	cluster_counts = np.bincount(labels, minlength=k).tolist()
+	print(f"DEBUG: K-medoids result for k={k}: cluster sizes = {cluster_counts} (cost {_cost(medoids):.1f})")
+
+	return labels.tolist()
+
+def _score_zone_clustering(points, labels, k):
+	"""Score a zone clustering for automatic zone-count selection.
+
+	Args:
+		points: List of (x, y) metre pairs.
+		labels: List[int] cluster index per point.
+		k: Number of clusters.
 
-	return labels
+	Returns:
+		Dict with "inertia" (sum of squared metres to the zone centroid), "silhouette"
+		(mean silhouette coefficient, None for k < 2) and "max_radius" (metres from the
+		farthest building to its zone centroid).
+	"""
+	X = np.asarray(points, dtype=float)
+	labels = np.asarray(labels)
+	counts = np.bincount(labels, minlength=k).astype(float)
+	centroids = np.stack([np.bincount(labels, weights=X[:, d], minlength=k) for d in range(X.shape[1])], axis=1)
+	centroids = np.divide(centroids, counts[:, None], out=np.zeros_like(centroids), where=counts[:, None] > 0)
+	to_centroid = np.sqrt(((X - centroids[labels]) ** 2).sum(axis=1))
+
+	silhouette = None
+	if 1 < k < len(points):
+		dist = np.sqrt(((X[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+		one_hot = (labels[:, None] == np.arange(k)[None, :]).astype(float)
+		dist_sums = dist @ one_hot  # (n, k) summed distance to each cluster's points
+		own = counts[labels]
+		a = dist_sums[np.arange(len(points)), labels] / np.maximum(own - 1, 1)
+		mean_to_other = np.where(one_hot > 0, np.inf, dist_sums / np.maximum(counts, 1)[None, :])
+		mean_to_other[:, counts == 0] = np.inf
+		b = mean_to_other.min(axis=1)
+		s = np.where(own > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+		silhouette = float(s.mean())
+
+	return {
+		"inertia": float((to_centroid ** 2).sum()),
+		"silhouette": silhouette,
+		"max_radius": float(to_centroid.max()),
+	}
 
 @bot.tree.command(name="help", description="Show all available bot commands and how to use them")
 async def help_command(interaction: discord.Interaction):
@@ -3965,6 +5476,11 @@ async def help_command(interaction: discord.Interaction):
     #     inline=False
     # )
     # embed.add_field(
+    #     name="📈 `/ticketstats` (Admin Only)",
+    #     value="Show time-to-first-response percentiles and escalation rates per zone and building, optionally exported as JSON.",
+    #     inline=False
+    # )
+    # embed.add_field(
     #     name="💾 `/cacheinfo` (Admin Only)",
     #     value="Show information about the cached spreadsheet connection.",
     #     inline=False
@@ -4041,11 +5557,11 @@ async def organize_roles_command(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
 
@@ -4074,8 +5590,8 @@ async def organize_roles_command(interaction: discord.Interaction):
                     bot_role = role
                     break
 
-            # Organize roles
-            await organize_role_hierarchy_for_guild(interaction.guild)
+            # Organize roles (always re-inspect, even if nothing seems to have changed)
+            await organize_role_hierarchy_for_guild(interaction.guild, force=True)
 
             # Check if there were permission issues
             higher_roles = [r for r in interaction.guild.roles if r.position >= (bot_role.position if bot_role else 0) and r.name != "@everyone" and r != bot_role]
@@ -4124,6 +5640,14 @@ async def organize_roles_command(interaction: discord.Interaction):
                     inline=False
                 )
 
+            embed.add_field(
+                name="📊 Automatic Reorganizations",
+                value=f"• **{role_hierarchy_stats['executed']}** executed\n"
+                      f"• **{role_hierarchy_stats['skipped']}** skipped (roles unchanged)\n"
+                      f"• **{role_hierarchy_stats['forced']}** forced by /organizeroles (not counted above)",
+                inline=False
+            )
+
             embed.set_footer(text="Role organization complete!")
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -4208,7 +5732,7 @@ async def reload_commands_command(interaction: discord.Interaction):
 async def login_command(interaction: discord.Interaction, email: str, password: str):
     """Login with email and password to get assigned roles"""
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
@@ -4497,18 +6021,40 @@ async def login_command(interaction: discord.Interaction, email: str, password:
 
 
 @bot.tree.command(name="assignrunnerzones", description="Assign zone numbers per building in 'Runner Assignments' using K-means (Admin only)")
-async def assign_runner_zones_command(interaction: discord.Interaction):
+@app_commands.describe(
+    weight="What sets how strongly each building pulls its zone (default: its number of rows)",
+    balance="Keep zones even by capping each zone's building count or weighted load (default: off)",
+    auto_zones="Pick the number of zones from the buildings and runner roster (default: only if the sheet has no Number of Zones)",
+    incremental="Only give buildings with an empty Zone Number cell the nearest existing zone; everything else stays as is",
+    distance="How building distance is measured (default: straight line from coordinates)"
+)
+@app_commands.choices(
+    weight=[
+        app_commands.Choice(name="Sheet rows", value="rows"),
+        app_commands.Choice(name="Past help tickets", value="tickets")
+    ],
+    balance=[
+        app_commands.Choice(name="Off", value="off"),
+        app_commands.Choice(name="Buildings per zone", value="buildings"),
+        app_commands.Choice(name="Weighted load per zone", value="load")
+    ],
+    distance=[
+        app_commands.Choice(name="Straight line", value="straight"),
+        app_commands.Choice(name="Walking times", value="walking")
+    ]
+)
+async def assign_runner_zones_command(interaction: discord.Interaction, weight: app_commands.Choice[str] = None, balance: app_commands.Choice[str] = None, auto_zones: bool = False, incremental: bool = False, distance: app_commands.Choice[str] = None):
     """Read 'Runner Assignments' worksheet, cluster by building into K zones, write labels to 'Zone Number' column."""
     # Admin only
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
     
@@ -4521,42 +6067,16 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
             )
             return
     
-        spreadsheet = spreadsheets[guild_id]
-    
-        # Open the worksheet or find a separate spreadsheet in the same Drive folder
+        # Reuse the remembered Runner Assignments worksheet, or find it in the same Drive folder
         worksheet_name = "Runner Assignments"
-        ws = None
         try:
-            ws = spreadsheet.worksheet(worksheet_name)
-        except Exception:
-            # If not a tab in the current spreadsheet, search the parent Drive folder for a spreadsheet named like it
-            try:
-                from googleapiclient.discovery import build
-                drive_service = build('drive', 'v3', credentials=creds)
-                # Get parent folder of the currently connected spreadsheet
-                sheet_metadata = drive_service.files().get(fileId=spreadsheet.id, fields='parents').execute()
-                parent_folders = sheet_metadata.get('parents', [])
-                if not parent_folders:
-                    await interaction.followup.send("❌ Could not determine parent folder to search for 'Runner Assignments' sheet.", ephemeral=True)
-                    return
-                parent_folder_id = parent_folders[0]
-                # Search spreadsheets in same folder
-                q = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains '{worksheet_name}'"
-                results = drive_service.files().list(q=q, fields='files(id, name)').execute()
-                files = results.get('files', [])
-                if not files:
-                    await interaction.followup.send(f"❌ Could not find a spreadsheet named '{worksheet_name}' in the same folder as the template.", ephemeral=True)
-                    return
-                target = files[0]
-                other_sheet = gc.open_by_key(target['id'])
-                # Prefer a worksheet named exactly worksheet_name; otherwise first tab
-                try:
-                    ws = other_sheet.worksheet(worksheet_name)
-                except Exception:
-                    ws = other_sheet.worksheets()[0]
-            except Exception as e2:
-                await interaction.followup.send(f"❌ Could not locate '{worksheet_name}' in the same Drive folder: {str(e2)}", ephemeral=True)
-                return
+            ws = await asyncio.to_thread(get_runner_assignments_worksheet, guild_id)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Could not locate '{worksheet_name}' in the same Drive folder: {str(e)}", ephemeral=True)
+            return
+        if ws is None:
+            await interaction.followup.send(f"❌ Could not find a '{worksheet_name}' tab or a spreadsheet named '{worksheet_name}' in the same folder as the template.", ephemeral=True)
+            return
     
         # Fetch data
         try:
@@ -4601,6 +6121,8 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
     # Build data per building
     from collections import defaultdict
     building_points = defaultdict(list)  # building -> list of (row_idx_1_based, (lat, lon))
+    existing_zones = {}  # row_idx_1_based -> zone number already in the sheet
+    unparsable_zones = {}  # row_idx_1_based -> non-blank Zone Number cell that isn't a whole number (never overwritten)
 
     # Find the global K value from any row that has it
     global_k = None
@@ -4614,16 +6136,6 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
             except Exception:
                 continue
 
-    def _parse_float(val):
-        try:
-            if isinstance(val, str):
-                val = val.strip()
-                if not val:
-                    return None
-            return float(val)
-        except Exception:
-            return None
-
     for idx, row in enumerate(rows, start=2):  # data starts at row 2
         # Case-insensitive row access
         lower_row = { (k.strip().lower() if isinstance(k, str) else k): v for k, v in row.items() }
@@ -4631,23 +6143,17 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
         if not building:
             continue
 
-        lat = _parse_float(lower_row.get("latitude", lower_row.get("lat")))
-        lon = _parse_float(lower_row.get("longitude", lower_row.get("lon", lower_row.get("lng"))))
-
-        if (lat is None or lon is None) and ("coordinates" in lower_row and lower_row["coordinates"]):
-            coord_str = str(lower_row["coordinates"]).strip()
-            if "," in coord_str:
-                parts = [p.strip() for p in coord_str.split(",")]
-                if len(parts) >= 2:
-                    if lat is None:
-                        lat = _parse_float(parts[0])
-                    if lon is None:
-                        lon = _parse_float(parts[1])
-
-        if lat is None or lon is None:
+        coords = parse_row_coordinates(row)
+        if coords is None:
             continue
 
-        building_points[building].append((idx, (lat, lon)))
+        building_points[building].append((idx, coords))
+        zone_cell = str(lower_row.get("zone number", "")).strip()
+        if zone_cell:
+            try:
+                existing_zones[idx] = int(zone_cell)
+            except ValueError:
+                unparsable_zones[idx] = zone_cell
 
     if not building_points:
         await interaction.followup.send("⚠️ No valid location rows found to cluster.", ephemeral=True)
@@ -4657,46 +6163,212 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
     updates = []  # list of (row_index, zone_label_str)
     k_to_use = global_k if global_k is not None and global_k > 0 else 1
 
-    # Collect ALL points from ALL buildings for global clustering
-    all_points = []
-    all_items = []  # (building, row_idx, point)
-
-    for bldg, items in building_points.items():
-        for row_idx, point in items:
-            all_points.append(point)
-            all_items.append((bldg, row_idx, point))
-
-    # Run K-means on ALL points together
-    labels = _run_kmeans_clustering(all_points, k_to_use)
-
-    # Debug: count cluster distribution by building
-    building_zone_counts = {}  # building -> {zone: count}
-    for i, (bldg, row_idx, point) in enumerate(all_items):
-        zone = labels[i] + 1  # Convert to 1-based
-        if bldg not in building_zone_counts:
-            building_zone_counts[bldg] = {}
-        building_zone_counts[bldg][zone] = building_zone_counts[bldg].get(zone, 0) + 1
-
-    debug_info = []
-    for bldg, zone_counts in building_zone_counts.items():
-        zones = sorted(zone_counts.keys())
-        counts = [zone_counts[z] for z in zones]
-        debug_info.append(f"{bldg}: zones {zones} (counts {counts})")
-
-    # Create updates
-    for i, (bldg, row_idx, point) in enumerate(all_items):
-        zone_label = str(labels[i] + 1)  # Convert to 1-based
-        updates.append((row_idx, zone_label))
-
-    # Apply updates (per cell to minimize risk of range mistakes)
+    # Cluster one point per building (the mean of its rows) instead of every row,
+    # weighted by its row count or by its past help tickets
+    weight_mode = weight.value if weight else "rows"
+    ticket_counts = {}  # lowercased building -> finished help tickets
+    if weight_mode == "tickets":
+        for record in (await state_store.fetch_all("ticket_metrics")).values():
+            if record.get("guild_id") == guild_id and record.get("building"):
+                key = record["building"].strip().lower()
+                ticket_counts[key] = ticket_counts.get(key, 0) + 1
+
+    building_names = list(building_points)
+    building_centers = []
+    building_weights = []
+    for bldg in building_names:
+        items = building_points[bldg]
+        building_centers.append((
+            sum(point[0] for _, point in items) / len(items),
+            sum(point[1] for _, point in items) / len(items)
+        ))
+        if weight_mode == "tickets":
+            # Buildings with no ticket history still count as one expected ticket
+            building_weights.append(1 + ticket_counts.get(bldg.lower(), 0))
+        else:
+            building_weights.append(len(items))
+
+    # Cluster in local metres rather than raw degrees, which stretch east-west away from the equator
+    projected_centers = _project_to_local_metres(building_centers)
+    balance_mode = balance.value if balance else "off"
+
+    # Walking times come from the guild's cached matrix, cut down to these buildings in this order
+    walk_matrix = None
+    if distance and distance.value == "walking":
+        state = await refresh_guild_state(guild_id)
+        walking = state.get("walking_times") if state else None
+        if not walking:
+            await interaction.followup.send(
+                f"❌ No walking-time matrix found. Add a '{WALKING_TIMES_TAB}' tab (building names across the first row and down the first column, minutes in between) "
+                "or set WALKING_TIMES_CSV, then try again.",
+                ephemeral=True
+            )
+            return
+        walk_index = {name: i for i, name in enumerate(walking["buildings"])}
+        missing = [bldg for bldg in building_names if bldg.lower() not in walk_index]
+        if missing:
+            await interaction.followup.send(
+                f"❌ The walking-time matrix has no times for: {', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}",
+                ephemeral=True
+            )
+            return
+        order = [walk_index[bldg.lower()] for bldg in building_names]
+        walk_matrix = np.asarray(walking["minutes"], dtype=float)[np.ix_(order, order)]
+
+    score_text = ""
+    affected_buildings = None  # Buildings whose chats get runner assignments (None = all of them)
+
+    if incremental:
+        # Existing zones stay fixed: their centroids come from the buildings already labelled.
+        # Only blank Zone Number cells are written; cells that don't parse as a zone are left alone and reported
+        def _is_blank(row_idx):
+            return row_idx not in existing_zones and row_idx not in unparsable_zones
+
+        zone_members = defaultdict(list)  # zone -> indexes into building_names
+        new_buildings = []  # indexes of buildings with no labelled row
+        for i, bldg in enumerate(building_names):
+            known = [existing_zones[row_idx] for row_idx, _ in building_points[bldg] if row_idx in existing_zones]
+            if known:
+                # A building keeps its zone; any new rows of it (e.g. an added room) just get that zone
+                zone = max(set(known), key=known.count)
+                zone_members[zone].append(i)
+                for row_idx, _ in building_points[bldg]:
+                    if _is_blank(row_idx):
+                        updates.append((row_idx, str(zone)))
+            elif any(_is_blank(row_idx) for row_idx, _ in building_points[bldg]):
+                new_buildings.append(i)
+
+        if not zone_members:
+            await interaction.followup.send(
+                "⚠️ No buildings have a zone yet, so there's nothing to extend. Run `/assignrunnerzones` without `incremental` first.",
+                ephemeral=True
+            )
+            return
+
+        zone_ids = sorted(zone_members)
+        centers = np.asarray(projected_centers)
+        weights = np.asarray(building_weights, dtype=float)
+        zone_centroids = np.stack([
+            (centers[zone_members[z]] * weights[zone_members[z], None]).sum(axis=0) / weights[zone_members[z]].sum()
+            for z in zone_ids
+        ])
+
+        # Each new building joins the nearest existing zone centroid, or the zone it has the shortest weighted mean walk to
+        debug_info = []
+        for i in new_buildings:
+            if walk_matrix is not None:
+                walks = [np.average(walk_matrix[i, zone_members[z]], weights=weights[zone_members[z]]) for z in zone_ids]
+                zone = zone_ids[int(np.argmin(walks))]
+            else:
+                zone = zone_ids[int(((zone_centroids - centers[i]) ** 2).sum(axis=1).argmin())]
+            for row_idx, _ in building_points[building_names[i]]:
+                if _is_blank(row_idx):
+                    updates.append((row_idx, str(zone)))
+            debug_info.append(f"{building_names[i]}: zone {zone} (new)")
+
+        # Only buildings that got a new cell need their chat told about runners
+        affected_buildings = {
+            bldg for bldg, items in building_points.items() if any(_is_blank(row_idx) for row_idx, _ in items)
+        }
+        k_to_use = len(zone_ids)
+
+        skipped_text = ""
+        if unparsable_zones:
+            skipped = [f"row {row_idx} ('{value}')" for row_idx, value in sorted(unparsable_zones.items())]
+            skipped_text = (
+                f"⚠️ Left {len(skipped)} Zone Number cell(s) that aren't a zone number untouched: "
+                + ", ".join(skipped[:10]) + (" ..." if len(skipped) > 10 else "") + "\n"
+            )
+
+        if not updates:
+            await interaction.followup.send(
+                skipped_text + "✅ Every building in '" + worksheet_name + "' already has a zone; nothing to update.",
+                ephemeral=True
+            )
+            return
+    else:
+        def _cluster(k):
+            if walk_matrix is not None:
+                return _run_kmedoids_clustering(
+                    walk_matrix, k,
+                    weights=building_weights,
+                    sizes=building_weights if balance_mode == "load" else None,
+                    tolerance=ZONE_BALANCE_TOLERANCE if balance_mode != "off" else None
+                )
+            if balance_mode == "off":
+                return _run_kmeans_clustering(projected_centers, k, weights=building_weights)
+            return _run_balanced_kmeans_clustering(
+                projected_centers, k,
+                weights=building_weights,
+                sizes=building_weights if balance_mode == "load" else None,
+                tolerance=ZONE_BALANCE_TOLERANCE
+            )
+
+        if auto_zones or global_k is None or global_k <= 0:
+            # Runners on the sheet cap the zone count so every zone keeps ZONE_MIN_RUNNERS.
+            # Runners are rows with a Runner Zone (and an email), like get_all_runners; one runner on several rows counts once
+            runner_emails = set()
+            for row in rows:
+                lower_row = {(k.strip().lower() if isinstance(k, str) else k): v for k, v in row.items()}
+                email = str(lower_row.get("email", "")).strip().lower()
+                if str(lower_row.get("runner zone", "")).strip() and email:
+                    runner_emails.add(email)
+            runner_count = len(runner_emails)
+            runner_cap = runner_count // ZONE_MIN_RUNNERS if runner_count else AUTO_ZONE_MAX
+            candidate_ks = list(range(1, max(1, min(AUTO_ZONE_MAX, len(building_names), runner_cap)) + 1))
+
+            def _evaluate(k):
+                k_labels = _cluster(k)
+                return k_labels, _score_zone_clustering(projected_centers, k_labels, k)
+
+            # Cluster and score every candidate zone count in parallel (clustering is CPU-bound, so off the event loop)
+            results = await asyncio.gather(*(asyncio.to_thread(_evaluate, k) for k in candidate_ks))
+            scores = {k: score for k, (_, score) in zip(candidate_ks, results)}
+
+            within_radius = [k for k in candidate_ks if scores[k]["max_radius"] <= ZONE_TARGET_RADIUS_METRES]
+            if within_radius:
+                # Best separated zone count that keeps every building within walking radius; one zone scores 0, ties go to fewer zones
+                k_to_use = max(within_radius, key=lambda k: (scores[k]["silhouette"] or 0, -k))
+            else:
+                # Nothing meets the radius with the runners available, so get as close as possible
+                k_to_use = min(candidate_ks, key=lambda k: (scores[k]["max_radius"], k))
+            labels = results[candidate_ks.index(k_to_use)][0]
+
+            score_lines = [f"{'k':>2}  {'silhouette':>10}  {'max radius':>10}  {'inertia (km²)':>13}  runners/zone"]
+            for k in candidate_ks:
+                silhouette = f"{scores[k]['silhouette']:.3f}" if scores[k]["silhouette"] is not None else "—"
+                marker = " ◀" if k == k_to_use else ""
+                score_lines.append(
+                    f"{k:>2}  {silhouette:>10}  {scores[k]['max_radius']:>8.0f} m  {scores[k]['inertia'] / 1e6:>13.2f}  {runner_count / k:>12.1f}{marker}"
+                )
+            score_text = (
+                f"🔢 Picked **{k_to_use}** zones automatically (target radius {ZONE_TARGET_RADIUS_METRES:.0f} m, "
+                f"at least {ZONE_MIN_RUNNERS} of {runner_count} runners per zone):\n```\n" + "\n".join(score_lines) + "\n```\n"
+            )
+        else:
+            # Clustering is CPU-bound, so keep it off the event loop
+            labels = await asyncio.to_thread(_cluster, k_to_use)
+
+        # Broadcast each building's zone back to all of its rows
+        debug_info = []
+        for i, bldg in enumerate(building_names):
+            zone_label = str(labels[i] + 1)  # Convert to 1-based
+            for row_idx, point in building_points[bldg]:
+                updates.append((row_idx, zone_label))
+            debug_info.append(f"{bldg}: zone {zone_label} (weight {building_weights[i]})")
+
+    # Write the zone cells in one request (still one range per cell, so no row can shift into another's)
     zones_col_letter = chr(ord('A') + zones_col_index - 1)
-    updated = 0
-    for row_idx, value in updates:
-        try:
-            ws.update(f"{zones_col_letter}{row_idx}", [[value]])
-            updated += 1
-        except Exception:
-            pass
+    try:
+        await asyncio.to_thread(ws.batch_update, [
+            {"range": f"{zones_col_letter}{row_idx}", "values": [[value]]} for row_idx, value in updates
+        ])
+    except Exception as e:
+        await interaction.followup.send(f"❌ Could not write zone numbers: {str(e)}", ephemeral=True)
+        return
+
+    # The zone map changed, so rebuild the state snapshot before anything routes tickets with it
+    await refresh_guild_state(guild_id)
 
     # Summarize K used per building (limit for brevity)
     # Send debug info first
@@ -4704,11 +6376,20 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
     if len(debug_info) > 5:
         debug_text += f"\n... and {len(debug_info) - 5} more buildings"
 
-    await interaction.followup.send(
-        f"✅ Assigned {k_to_use} zones for {len(updates)} rows across {len(building_points)} buildings in '{worksheet_name}'.\n\n"
-        f"Now sending runner assignments to building channels...",
-        ephemeral=True
-    )
+    if incremental:
+        summary = (
+            f"✅ Gave {len(updates)} new row(s) across {len(affected_buildings)} building(s) the nearest of the {k_to_use} existing zones in '{worksheet_name}'. "
+            f"Existing assignments are unchanged.\n" + skipped_text + "\n".join(debug_info[:10]) + "\n\n"
+        )
+    else:
+        summary = (
+            f"✅ Assigned {k_to_use} zones for {len(updates)} rows across {len(building_points)} buildings in '{worksheet_name}' "
+            f"(weighted by {'past help tickets' if weight_mode == 'tickets' else 'rows'}"
+            f"{', balanced by ' + ('building count' if balance_mode == 'buildings' else 'weighted load') if balance_mode != 'off' else ''}"
+            f"{', k-medoids on walking times' if walk_matrix is not None else ''}).\n\n"
+            f"{score_text}"
+        )
+    await interaction.followup.send(summary + "Now sending runner assignments to building channels...", ephemeral=True)
 
     # Send messages to each building channel with their designated runners
     try:
@@ -4734,14 +6415,15 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
                 except ValueError:
                     pass
         
-        # First pass: find all buildings and their zones
+        # First pass: find all buildings and their zones (the cells just written win over what was read before)
         building_zones = {}  # building -> zone_number
         zone_buildings = defaultdict(list)  # zone -> [building names]
+        written_zones = dict(updates)  # row_idx -> zone label
         
         for idx, row in enumerate(rows, start=2):
             lower_row = {(k.strip().lower() if isinstance(k, str) else k): v for k, v in row.items()}
             building = str(lower_row.get("building", lower_row.get("building 1", ""))).strip()
-            zone_raw = str(lower_row.get("zone number", lower_row.get("zone", ""))).strip()
+            zone_raw = written_zones.get(idx, str(lower_row.get("zone number", lower_row.get("zone", ""))).strip())
             
             # If this row has a building and zone, it's a building definition
             if building and zone_raw:
@@ -4793,15 +6475,20 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
             building_runners[building] = runners_in_zone
             print(f"✅ Matched {len(runners_in_zone)} runners to building {building} (zone {zone_num})")
         
-        # Send message to each building channel
-        messages_sent = 0
+        # Build every building chat's message first, resolving channels through one name index
+        channel_index = build_channel_index(guild)
+        jobs = []
         for building, runners in building_runners.items():
-            # Find the building chat channel
-            building_chat_name = f"{building.lower().replace(' ', '-')}-chat"
-            building_channel = discord.utils.get(guild.text_channels, name=building_chat_name)
+            # An incremental run only touches the chats of buildings that got a zone
+            if affected_buildings is not None and building not in affected_buildings:
+                continue
+
+            # Find the building chat channel (named the way setup_building_structure creates it)
+            chat_name = building_chat_name(building)
+            building_channel = channel_index.get(chat_name)
             
             if not building_channel:
-                print(f"⚠️ Could not find building channel: {building_chat_name}")
+                print(f"⚠️ Could not find building channel: {chat_name}")
                 continue
             
             if not runners:
@@ -4830,15 +6517,21 @@ async def assign_runner_zones_command(interaction: discord.Interaction):
             )
             
             embed.set_footer(text="If you need help, create a ticket in the #help forum!\nDM these runners if you need urgent help!")
-            
-            try:
-                await building_channel.send(embed=embed)
+            jobs.append((building_channel, "designated_runners", embed, f"🏃 Designated Runners for {building}"))
+
+        # Then edit the registered messages in place (or post them once), several channels at a time;
+        # unchanged assignments cost no API call
+        results = await fan_out_registered_messages(jobs)
+        messages_sent = 0
+        for (building_channel, _, _, _), status in zip(jobs, results):
+            if isinstance(status, Exception):
+                print(f"⚠️ Error sending message to {building_channel.name}: {status}")
+                continue
+            if status in ("posted", "edited"):
                 messages_sent += 1
-                print(f"✅ Sent runner assignments to {building_chat_name}")
-            except Exception as e:
-                print(f"⚠️ Error sending message to {building_chat_name}: {e}")
+            print(f"✅ Runner assignments in {building_channel.name}: {status}")
         
-        print(f"✅ Sent runner assignments to {messages_sent} building channels")
+        print(f"✅ Posted or updated runner assignments in {messages_sent} of {len(jobs)} building channels")
         
     except Exception as e:
         print(f"⚠️ Error sending runner assignments to channels: {e}")
@@ -4881,166 +6574,100 @@ async def sync_members():
     print(f"✅ Total sync complete. Processed {total_processed} valid Discord IDs across {len(bot.guilds)} guilds.")
 
 
-@tasks.loop(minutes=1)
-async def check_help_tickets():
-    """Every minute, check for unresponded help tickets and re-ping if needed."""
-    if not active_help_tickets:
-        return
-
-    print(f"🎫 Checking {len(active_help_tickets)} active help tickets...")
-
-    current_time = datetime.now()
-    tickets_to_remove = []
-
-    for thread_id, ticket_info in active_help_tickets.items():
-        try:
-            # Calculate time since last ping
-            time_since_created = current_time - ticket_info["created_at"]
-
-            # Determine wait time based on ping count
-            # ping_count = 1 (after 1st ping): wait 3 minutes for 2nd ping
-            # ping_count = 2 (after 2nd ping): wait 1 minute for 3rd ping
-            ping_count = ticket_info["ping_count"]
-            if ping_count == 1:
-                wait_time = timedelta(minutes=3)
-            elif ping_count == 2:
-                wait_time = timedelta(minutes=1)
-            else:
-                # Should not reach here, but default to 3 minutes
-                wait_time = timedelta(minutes=1)
-
-            # Check if enough time has passed since last ping
-            if time_since_created >= wait_time:
-                # Find the thread across all guilds
-                thread = None
-                for guild in bot.guilds:
-                    thread = guild.get_thread(thread_id)
-                    if thread:
-                        break
-
-                if not thread:
-                    print(f"⚠️ Thread {thread_id} not found in any guild, removing from tracking")
-                    tickets_to_remove.append(thread_id)
-                    continue
-
-                # Check if thread is still active/not archived
-                if thread.archived or thread.locked:
-                    print(f"🗄️ Thread {thread_id} is archived/locked, removing from tracking")
-                    tickets_to_remove.append(thread_id)
-                    continue
+async def process_due_ticket(thread_id):
+    """Re-ping one ticket whose deadline has passed, then schedule its next ping"""
+    ticket_info = active_help_tickets[thread_id]
+    try:
+        # A claimed ticket's deadline is its claim running out, not a re-ping
+        if ticket_info.get("claimed_by"):
+            print(f"✅ Claim on ticket {thread_id} ran its course, removing from tracking")
+            forget_ticket(thread_id, outcome="claim_expired")
+            return
 
-                # Check ping count limit (max 3 pings)
-                if ticket_info["ping_count"] >= 3:
-                    print(f"⏹️ Thread {thread_id} reached max ping limit, removing from tracking")
-                    tickets_to_remove.append(thread_id)
-                    continue
+        # The ticket knows its guild, so there's no search across every guild
+        guild = bot.get_guild(ticket_info["guild_id"])
+        thread = guild.get_thread(thread_id) if guild else None
 
-                # Re-ping the runners
-                await send_ticket_repings(thread, ticket_info)
+        if not thread:
+            print(f"⚠️ Thread {thread_id} not found, removing from tracking")
+            forget_ticket(thread_id, outcome="deleted")
+            return
 
-                # Update ping count and reset timer
-                ticket_info["ping_count"] += 1
-                ticket_info["created_at"] = current_time
-                print(f"🔄 Re-pinged ticket {thread_id} (ping #{ticket_info['ping_count']})")
+        # Check if thread is still active/not archived
+        if thread.archived or thread.locked:
+            print(f"🗄️ Thread {thread_id} is archived/locked, removing from tracking")
+            forget_ticket(thread_id, outcome="archived")
+            return
 
-        except Exception as e:
-            print(f"❌ Error checking ticket {thread_id}: {e}")
-            tickets_to_remove.append(thread_id)
+        # Check ping count limit (max 3 pings)
+        if ticket_info["ping_count"] >= 3:
+            print(f"⏹️ Thread {thread_id} reached max ping limit, removing from tracking")
+            forget_ticket(thread_id, outcome="unanswered")
+            return
 
-    # Clean up invalid tickets
-    for thread_id in tickets_to_remove:
-        if thread_id in active_help_tickets:
-            del active_help_tickets[thread_id]
-            print(f"🗑️ Removed invalid ticket {thread_id} from tracking")
+        # Re-ping the runners
+        await send_ticket_repings(thread, ticket_info)
 
+        # The ticket may have been claimed while the re-ping was being sent
+        if thread_id not in active_help_tickets or ticket_info.get("claimed_by"):
+            return
 
-async def get_all_runners(guild_id):
-    """Get Discord IDs of ALL runners from the Runner Assignments sheet"""
-    if guild_id not in spreadsheets:
-        print(f"❌ No spreadsheet connected for guild {guild_id}")
-        return []
+        # Update ping count and reset timer
+        current_time = datetime.now()
+        ticket_info["ping_count"] += 1
+        ticket_info["created_at"] = current_time
+        ticket_info["ping_times"].append(current_time)
+        ticket_info["next_due_at"] = current_time + ticket_wait_time(ticket_info["ping_count"])
+        persist_ticket(thread_id)
+        schedule_ticket(thread_id)
+        print(f"🔄 Re-pinged ticket {thread_id} (ping #{ticket_info['ping_count']})")
 
-    try:
-        spreadsheet = spreadsheets[guild_id]
+    except Exception as e:
+        print(f"❌ Error checking ticket {thread_id}: {e}")
+        forget_ticket(thread_id, outcome="error")
 
-        # Try to get the Runner Assignments worksheet
+async def run_ticket_scheduler():
+    """Sleep until the earliest ticket deadline, re-ping it, and wake early whenever tickets change"""
+    while True:
         try:
-            sheet = spreadsheet.worksheet("Runner Assignments")
-        except Exception:
-            # If not found as a worksheet, search for a separate spreadsheet
-            try:
-                from googleapiclient.discovery import build
-                drive_service = build('drive', 'v3', credentials=creds)
-
-                # Get parent folder of the currently connected spreadsheet
-                sheet_metadata = drive_service.files().get(fileId=spreadsheet.id, fields='parents').execute()
-                parent_folders = sheet_metadata.get('parents', [])
-                if not parent_folders:
-                    print("❌ Could not determine parent folder for all runners lookup")
-                    return []
-
-                parent_folder_id = parent_folders[0]
-
-                # Search for Runner Assignments spreadsheet
-                q = f"'{parent_folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet' and name contains 'Runner Assignments'"
-                results = drive_service.files().list(q=q, fields='files(id, name)').execute()
-                files = results.get('files', [])
-
-                if not files:
-                    print("❌ Could not find Runner Assignments spreadsheet")
-                    return []
-
-                # Open the first matching spreadsheet
-                runner_spreadsheet = gc.open_by_key(files[0]['id'])
-                sheet = runner_spreadsheet.sheet1  # Use first worksheet
-
-            except Exception as e:
-                print(f"❌ Error finding Runner Assignments spreadsheet: {e}")
-                return []
-
-        # Get all data from the sheet
-        data = sheet.get_all_records()
+            # Skip entries for tickets that were resolved or rescheduled since they were queued
+            while ticket_schedule:
+                due_at, thread_id = ticket_schedule[0]
+                ticket_info = active_help_tickets.get(thread_id)
+                if ticket_info and ticket_info["next_due_at"] == due_at:
+                    break
+                heapq.heappop(ticket_schedule)
 
-        # Find all runner emails (anyone with a "Runner Zone" value)
-        runner_emails = []
-        for row in data:
-            runner_zone = row.get("Runner Zone", "")
-            if runner_zone:  # Has a runner zone assigned
-                email = str(row.get("Email", "")).strip()
-                if email:
-                    runner_emails.append(email.lower())
+            ticket_schedule_wakeup.clear()
+            if not ticket_schedule:
+                await ticket_schedule_wakeup.wait()
+                continue
 
-        if not runner_emails:
-            print("⚠️ No runner emails found in Runner Assignments")
-            return []
+            delay = (ticket_schedule[0][0] - datetime.now()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(ticket_schedule_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
 
-        print(f"🔍 Found {len(runner_emails)} total runner emails")
+            _, thread_id = heapq.heappop(ticket_schedule)
+            await process_due_ticket(thread_id)
 
-        # Now cross-reference with the main sheet to get Discord IDs
-        try:
-            main_sheet = spreadsheet.worksheet(SHEET_PAGE_NAME)
-            main_data = main_sheet.get_all_records()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"❌ Error accessing main sheet for Discord ID lookup: {e}")
-            return []
-
-        all_runners = []
-        for row in main_data:
-            email = str(row.get("Email", "")).strip().lower()
-            if email in runner_emails:
-                discord_id = str(row.get("Discord ID", "")).strip()
-                if discord_id:
-                    try:
-                        all_runners.append(int(discord_id))
-                    except ValueError:
-                        print(f"⚠️ Invalid Discord ID '{discord_id}' for runner email {email}")
+            print(f"❌ Error in help ticket scheduler: {e}")
+            await asyncio.sleep(1)
 
-        print(f"✅ Found {len(all_runners)} total runner Discord IDs")
-        return all_runners
 
-    except Exception as e:
-        print(f"❌ Error looking up all runners: {e}")
+async def get_all_runners(guild_id):
+    """Get Discord IDs of ALL runners from the routing table"""
+    routing = await get_routing_table(guild_id)
+    if routing is None:
+        print(f"❌ No spreadsheet connected for guild {guild_id}")
         return []
+    return list(routing["all_runners"])
 
 
 async def send_ticket_repings(thread, ticket_info):
@@ -5059,9 +6686,15 @@ async def send_ticket_repings(thread, ticket_info):
                 if member:
                     runner_mentions.append(member.mention)
         else:
-            # Regular ping - just zone runners
+            # Regular ping - the runners already assigned plus the next least-loaded ones, widening to nearby zones
+            routing = await get_routing_table(thread.guild.id)
+            if routing is not None:
+                added = select_ticket_runners(thread.guild, routing, ticket_info["zone"], set(ticket_info["assigned_runners"]))
+                ticket_info["assigned_runners"].extend(added)
+                if added:
+                    print(f"➕ Widened ticket {thread.id} to {len(added)} more runner(s)")
             runner_mentions = []
-            for runner_id in ticket_info["zone_runners"]:
+            for runner_id in ticket_info["assigned_runners"]:
                 member = thread.guild.get_member(runner_id)
                 if member:
                     runner_mentions.append(member.mention)
@@ -5107,8 +6740,10 @@ async def send_ticket_repings(thread, ticket_info):
                 inline=False
             )
 
+        embed.set_footer(text=f"React with {CLAIM_REACTION} or reply to claim this ticket")
+
         # Send mentions as regular message content (not in embed) so Discord actually notifies users
-        await thread.send(content=mention_text, embed=embed)
+        await send_ticket_ping(thread, mention_text, embed)
         print(f"📢 Sent re-ping #{ping_count} for ticket {thread.id}")
 
     except Exception as e:
@@ -5231,9 +6866,10 @@ async def active_tickets_command(interaction: discord.Interaction):
                 location_parts.append(f"Room {ticket_info['room']}")
             location = ", ".join(location_parts)
 
+            claim_text = f"\n**Claimed by:** <@{ticket_info['claimed_by']}>" if ticket_info.get("claimed_by") else ""
             embed.add_field(
                 name=f"🎫 {thread_name}",
-                value=f"**Event:** {ticket_info['event']}\n**Location:** {location}\n**Zone:** {ticket_info['zone']}\n**Pings:** {ticket_info['ping_count']}\n**Time:** {minutes_elapsed}m ago",
+                value=f"**Event:** {ticket_info['event']}\n**Location:** {location}\n**Zone:** {ticket_info['zone']}\n**Pings:** {ticket_info['ping_count']}\n**Time:** {minutes_elapsed}m ago{claim_text}",
                 inline=True
             )
 
@@ -5253,6 +6889,127 @@ async def active_tickets_command(interaction: discord.Interaction):
         traceback.print_exc()
 
 
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None for an empty list)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize_ticket_metrics(records):
+    """
+    Aggregate finished tickets' timing records.
+
+    Returns:
+        Dict with ticket/answer counts, p50/p90/p99 seconds to first response,
+        the re-ping ("escalation") and final-call rates, and the message/reaction split
+    """
+    response_times = [r["response_seconds"] for r in records if r.get("response_seconds") is not None]
+    total = len(records)
+    return {
+        "tickets": total,
+        "answered": len(response_times),
+        "p50_seconds": percentile(response_times, 50),
+        "p90_seconds": percentile(response_times, 90),
+        "p99_seconds": percentile(response_times, 99),
+        "escalation_rate": sum(1 for r in records if r.get("ping_count", 1) > 1) / total if total else 0,
+        "final_call_rate": sum(1 for r in records if r.get("ping_count", 1) >= 3) / total if total else 0,
+        "message_responses": sum(1 for r in records if r.get("response_kind") == "message"),
+        "reaction_responses": sum(1 for r in records if r.get("response_kind") == "reaction"),
+    }
+
+def format_duration(seconds):
+    """Format seconds as e.g. '2m 05s' ('—' when there's no value)"""
+    if seconds is None:
+        return "—"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {secs:02d}s" if minutes else f"{secs}s"
+
+
+@bot.tree.command(name="ticketstats", description="Show help ticket response times per zone and building (Admin only)")
+@app_commands.describe(export="Also attach the stats and every ticket's timing record as JSON")
+async def ticket_stats_command(interaction: discord.Interaction, export: bool = False):
+    """Show time-to-first-response percentiles and escalation rates for finished help tickets"""
+    # Admin only
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+
+    try:
+        # Include tickets that finished within the current flush window
+        await flush_ticket_changes(delay=0)
+
+        guild_id = interaction.guild.id
+        records = {
+            thread_id: record for thread_id, record in (await state_store.fetch_all("ticket_metrics")).items()
+            if record.get("guild_id") == guild_id
+        }
+        if not records:
+            await interaction.followup.send("📭 No finished help tickets recorded yet.")
+            return
+
+        by_zone = {}
+        by_building = {}
+        for record in records.values():
+            by_zone.setdefault(str(record.get("zone")), []).append(record)
+            by_building.setdefault(record.get("building") or "Unknown", []).append(record)
+
+        overall = summarize_ticket_metrics(list(records.values()))
+        zone_stats = {zone: summarize_ticket_metrics(group) for zone, group in by_zone.items()}
+        building_stats = {building: summarize_ticket_metrics(group) for building, group in by_building.items()}
+
+        def _describe(stats):
+            return (
+                f"**Tickets:** {stats['tickets']} ({stats['answered']} answered)\n"
+                f"**p50/p90/p99:** {format_duration(stats['p50_seconds'])} / {format_duration(stats['p90_seconds'])} / {format_duration(stats['p99_seconds'])}\n"
+                f"**Re-pinged:** {stats['escalation_rate']:.0%} · **Final call:** {stats['final_call_rate']:.0%}"
+            )
+
+        embed = discord.Embed(
+            title="📈 Help Ticket Response Times",
+            description=_describe(overall) + f"\n**Answered by:** {overall['message_responses']} message(s), {overall['reaction_responses']} reaction(s)",
+            color=discord.Color.blue()
+        )
+
+        # Discord allows 25 fields: up to 12 zones and the 12 busiest buildings
+        def _zone_order(zone):
+            return (0, int(zone)) if zone.isdigit() else (1, 0)
+        for zone in sorted(zone_stats, key=_zone_order)[:12]:
+            embed.add_field(name=f"🗺️ Zone {zone}", value=_describe(zone_stats[zone]), inline=True)
+        for building in sorted(building_stats, key=lambda b: -building_stats[b]["tickets"])[:12]:
+            embed.add_field(name=f"🏢 {building}", value=_describe(building_stats[building]), inline=True)
+
+        if len(zone_stats) > 12 or len(building_stats) > 12:
+            embed.set_footer(text="Some zones/buildings are left out here; use export for the full breakdown")
+
+        if not export:
+            await interaction.followup.send(embed=embed)
+            return
+
+        payload = {
+            "generated_at": datetime.now().isoformat(),
+            "guild_id": guild_id,
+            "overall": overall,
+            "zones": zone_stats,
+            "buildings": building_stats,
+            "tickets": records,
+        }
+        export_file = discord.File(
+            io.BytesIO(json.dumps(payload, indent=2).encode("utf-8")),
+            filename=f"ticket_stats_{guild_id}.json"
+        )
+        await interaction.followup.send(embed=embed, file=export_file)
+
+    except Exception as e:
+        await interaction.followup.send(f"❌ Error building ticket stats: {str(e)}")
+        print(f"❌ Ticket stats error: {e}")
+        import traceback
+        traceback.print_exc()
+
+
 @bot.tree.command(name="stopburgers", description="Stop all active burger deliveries")
 async def stop_burgers_command(interaction: discord.Interaction):
     """Emergency stop command for burger deliveries"""
@@ -5294,11 +7051,11 @@ async def send_all_materials_command(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
 
@@ -5341,45 +7098,25 @@ async def send_all_materials_command(interaction: discord.Interaction):
             # Send initial status
             await interaction.followup.send(
                 f"🔄 Processing test materials for {len(event_roles)} event(s)...\n\n"
-                f"• Deleting old pinned test materials\n"
-                f"• Sending new test materials\n\n"
+                f"• Posting test materials that are missing\n"
+                f"• Updating pinned test materials that changed\n\n"
                 f"This may take a while. Check the event channels for results.",
                 ephemeral=True
             )
 
+            # Fetch the Drive folder tree once up front; every event below is then a dictionary lookup
+            try:
+                await get_drive_folder_tree(guild_id, max_age=0)
+            except Exception as e:
+                print(f"⚠️ Could not fetch Drive folder tree: {e}")
+
             # Loop through all event roles and send test materials
             success_count = 0
-            deleted_count = 0
             for role_name in event_roles:
                 try:
                     print(f"📚 Processing test materials for: {role_name}")
                     
-                    # First, delete old pinned test materials from this event's channels
-                    sanitized_role_name = role_name.lower().replace(' ', '-').replace('/', '-').replace('\\', '-').replace(':', '-').replace('*', '-').replace('?', '-').replace('"', '').replace('<', '').replace('>', '').replace('|', '-')
-                    
-                    # Find all channels that belong to this event (start with the sanitized role name)
-                    event_channels = [ch for ch in guild.text_channels if ch.name.startswith(sanitized_role_name + "-")]
-                    
-                    for channel in event_channels:
-                        try:
-                            # Get all pinned messages in this channel
-                            pinned_messages = await channel.pins()
-                            
-                            # Delete pinned messages that were sent by the bot
-                            for msg in pinned_messages:
-                                if msg.author == bot.user:
-                                    try:
-                                        await msg.delete()
-                                        deleted_count += 1
-                                        print(f"🗑️ Deleted old pinned test material from #{channel.name}")
-                                        # Small delay to avoid rate limiting
-                                        await asyncio.sleep(0.2)
-                                    except Exception as delete_error:
-                                        print(f"⚠️ Could not delete message in #{channel.name}: {delete_error}")
-                        except Exception as pin_error:
-                            print(f"⚠️ Error checking pins in #{channel.name}: {pin_error}")
-                    
-                    # Now send new test materials
+                    # Registered messages are edited in place, so nothing needs deleting first
                     print(f"📚 Searching test materials for: {role_name}")
                     await search_and_share_test_folder(guild, role_name)
                     success_count += 1
@@ -5409,16 +7146,10 @@ async def send_all_materials_command(interaction: discord.Interaction):
                 description=f"Successfully sent test materials for **{success_count}/{len(event_roles)}** events!",
                 color=discord.Color.green()
             )
-            
-            if deleted_count > 0:
-                result_embed.add_field(
-                    name="🗑️ Old Materials Cleaned",
-                    value=f"Deleted **{deleted_count}** old pinned test material message(s)",
-                    inline=False
-                )
+
 
             await interaction.followup.send(embed=result_embed, ephemeral=True)
-            print(f"✅ Test materials command completed: {success_count}/{len(event_roles)} events processed, {deleted_count} old messages deleted")
+            print(f"✅ Test materials command completed: {success_count}/{len(event_roles)} events processed")
 
         except Exception as e:
             await interaction.followup.send(f"❌ Error sending test materials: {str(e)}", ephemeral=True)
@@ -5438,10 +7169,10 @@ async def cache_info_command(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
 
     try:
-        cache = load_cache()
+        guild_cache = await state_store.fetch("guilds", interaction.guild.id)
 
-        if not cache:
-            await interaction.followup.send("📄 No cache file found.")
+        if not guild_cache:
+            await interaction.followup.send("📄 No cached connection for this server.")
             return
 
         embed = discord.Embed(
@@ -5451,46 +7182,41 @@ async def cache_info_command(interaction: discord.Interaction):
         )
 
         # Basic connection info
-        if cache.get("spreadsheet_id"):
+        spreadsheet_id = guild_cache.get("spreadsheet_id")
+        if spreadsheet_id:
+            connected = spreadsheets.get(interaction.guild.id)
+            title = connected.title if connected and connected.id == spreadsheet_id else "Unknown"
             embed.add_field(
                 name="📊 Spreadsheet",
-                value=f"**Title:** {cache.get('spreadsheet_title', 'Unknown')}\n**ID:** `{cache.get('spreadsheet_id')}`",
+                value=f"**Title:** {title}\n**ID:** `{spreadsheet_id}`",
                 inline=False
             )
 
-        if cache.get("worksheet_name"):
+        if guild_cache.get("worksheet_name"):
             embed.add_field(
                 name="📋 Worksheet",
-                value=cache.get("worksheet_name"),
+                value=guild_cache.get("worksheet_name"),
                 inline=True
             )
 
-        if cache.get("connected_at"):
-            try:
-                connected_time = datetime.fromisoformat(cache.get("connected_at"))
-                embed.add_field(
-                    name="🕐 Connected At",
-                    value=connected_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    inline=True
-                )
-            except:
-                embed.add_field(name="🕐 Connected At", value="Unknown format", inline=True)
-
-        if cache.get("folder_link"):
+        state = get_guild_state(interaction.guild.id)
+        if state and state.get("validated_at"):
+            validated_time = datetime.fromisoformat(state["validated_at"])
             embed.add_field(
-                name="📁 Folder Link",
-                value=f"[Open in Drive]({cache.get('folder_link')})",
-                inline=False
+                name="🕐 Snapshot Validated At",
+                value=validated_time.strftime("%Y-%m-%d %H:%M:%S"),
+                inline=True
             )
 
-        # Cache file info
-        if os.path.exists(CACHE_FILE):
-            file_size = os.path.getsize(CACHE_FILE)
-            embed.add_field(
-                name="📄 Cache File",
-                value=f"**Path:** `{CACHE_FILE}`\n**Size:** {file_size} bytes",
-                inline=False
-            )
+        # State store info
+        counts = await asyncio.to_thread(state_store.stats)
+        counts_text = "\n".join(f"• {namespace}: {count}" for namespace, count in sorted(counts.items())) or "Empty"
+        file_size = os.path.getsize(STATE_DB_FILE) if os.path.exists(STATE_DB_FILE) else 0
+        embed.add_field(
+            name="📄 State Store",
+            value=f"**Path:** `{STATE_DB_FILE}`\n**Size:** {file_size} bytes\n{counts_text}",
+            inline=False
+        )
 
         await interaction.followup.send(embed=embed)
 
@@ -5507,11 +7233,11 @@ async def clear_cache_command(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
         
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
 
@@ -5519,7 +7245,7 @@ async def clear_cache_command(interaction: discord.Interaction):
             guild_id = interaction.guild.id
 
             # Clear the guild-specific cache
-            cleared = clear_guild_cache(guild_id)
+            cleared = await clear_guild_cache(guild_id)
 
             # Also clear the current connection for this guild
             if guild_id in sheets:
@@ -5565,11 +7291,11 @@ async def send_singular_material_command(interaction: discord.Interaction, mater
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
 
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
 
         await interaction.response.defer(ephemeral=True)
 
@@ -5691,6 +7417,7 @@ async def set_runner_all_access_command(interaction: discord.Interaction, runner
         return
     
     if (runner_access != runner_all_access):
+        await interaction.response.defer(ephemeral=True)
         guild = interaction.guild
         runner_all_access = runner_access
         try:
@@ -5702,29 +7429,48 @@ async def set_runner_all_access_command(interaction: discord.Interaction, runner
             runner_role = discord.utils.get(guild.roles, name="Runner")
             static_categories = ["Welcome", "Tournament Officials", "Volunteers"]
 
+            pending_edits = []
+            unchanged_count = 0
             for building in category:
                 if (building.name not in static_categories):
                     for room in building.channels:
                         overwrites = room.overwrites
 
                         if (runner_all_access):
-                            overwrites[runner_role] = discord.PermissionOverwrite(
-                                read_messages=True,
-                                send_messages=True,
-                                read_message_history=True
-                            )
+                            desired = runner_text_overwrite()
+                            if room.overwrites_for(runner_role) == desired:
+                                unchanged_count += 1
+                                continue
+                            overwrites[runner_role] = desired
                         else:
                             # Remove Runner overwrite entirely instead of forcing read=False
-                            if runner_role in overwrites:
-                                del overwrites[runner_role]
-
-                        await handle_rate_limit(
-                            room.edit(overwrites=overwrites, reason=f"Added {runner_role.name} access to all channels"),
+                            if runner_role not in overwrites:
+                                unchanged_count += 1
+                                continue
+                            del overwrites[runner_role]
+
+                        pending_edits.append((
+                            room,
+                            overwrites,
+                            f"Added {runner_role.name} access to all channels",
                             f"editing channel '{room.name}' permissions"
-                        )
+                        ))
+
+            edited = await apply_channel_overwrite_edits(pending_edits)
+            failed_count = len(pending_edits) - len(edited)
+            summary = (
+                f"✅ Runner all access {'enabled' if runner_all_access else 'disabled'}: "
+                f"{len(edited)} channels edited, {unchanged_count} already correct (no-op)"
+                + (f", {failed_count} could not be edited" if failed_count else "")
+            )
+            print(summary)
+            await interaction.followup.send(summary, ephemeral=True)
             
         except discord.Forbidden:
             print(f"❌ Error with giving or removing runner access to all channels")
+            await interaction.followup.send("❌ No permission to change Runner access on some channels.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"ℹ️ Runner all access is already set to {runner_access}, nothing to change.", ephemeral=True)
 
 @bot.tree.command(name="refreshnicknames", description="Reapply nicknames for all users with a Discord ID (Admin only)")
 async def refresh_nicknames_command(interaction: discord.Interaction):
@@ -5875,11 +7621,11 @@ async def role_reset_command(interaction: discord.Interaction):
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
     
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
+    async with guild_admin_session(interaction.guild_id):
         priority_roles = ["Admin", "Volunteer", "Lead ES", "Social Media", "Photographer", "Arbitrations", "Awards", "Runner", "VIPer"]
 
         # Defer immediately since this will take time
@@ -6054,19 +7800,17 @@ async def role_reset_command(interaction: discord.Interaction):
 async def reset_server_command(interaction: discord.Interaction):
     """⚠️ DANGER: Completely reset the server by deleting all channels, categories, roles, and nicknames"""
 
-    global reset_active
-
     # Check if user has administrator permission
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("❌ You need administrator permissions to use this command!", ephemeral=True)
         return
     
-    if admin_lock.locked():
+    if get_admin_lock(interaction.guild_id).locked():
         await interaction.response.send_message("❌ Server configurations are changing. Please try this when configurations is done!", ephemeral=True)
         return
     
-    async with admin_lock:
-        reset_active = True
+    async with guild_admin_session(interaction.guild_id):
+        reset_active_guilds.add(interaction.guild_id)
 
         # Defer immediately since this will take time
         await interaction.response.defer(ephemeral=True)
@@ -6235,9 +7979,17 @@ async def reset_server_command(interaction: discord.Interaction):
 
 @bot.tree.interaction_check
 async def block_commands_during_reset(interaction: discord.Interaction) -> bool:
-    global reset_active
+    # Hold back commands in a guild until its own startup setup has finished
+    if interaction.guild and guild_setup_status.get(interaction.guild.id) in ("pending", "running"):
+        await interaction.response.send_message(
+            "⏳ The bot is still setting up this server.\n"
+            "Please try again in a minute.",
+            ephemeral=True
+        )
+        return False
 
-    if not reset_active:
+    # Only the guild that was reset is restricted
+    if interaction.guild_id not in reset_active_guilds:
         return True
 
     # Allow only enterfolder during reset